@@ -0,0 +1,45 @@
+"""Run the benchmark suite: python -m benchmarks [--save FILE] [--compare FILE]"""
+
+import argparse
+import sys
+
+from . import (  # noqa: F401 (registers benchmarks)
+    harness,
+    models,
+    rendering,
+    scaling,
+    simulation,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks")
+    parser.add_argument("names", nargs="*", help="only run benchmarks containing these")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--save", metavar="FILE", help="write results as a JSON baseline"
+    )
+    parser.add_argument(
+        "--compare", metavar="FILE", help="compare with a JSON baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="slowdown that counts as a regression (default 0.10)",
+    )
+    args = parser.parse_args()
+
+    results = harness.run(args.names, args.repeat)
+    if args.save:
+        harness.save(results, args.save)
+    if args.compare:
+        regressions = harness.compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Registry, timing and JSON baselines for the benchmark suite"""
+
+import json
+import math
+import platform
+import time
+import timeit
+
+# name -> function returning (callable, operations per call) or
+# (callable, operations per call, untimed callable run before every call)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark setup function under a name"""
+
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def measure(func, ops=1, repeat=5, min_time=0.2, prepare=None):
+    """Time a callable and return the best seconds per operation
+
+    prepare, if given, runs before every call without being timed.
+    """
+    if prepare is None:
+        timed = timeit.Timer(func).timeit
+    else:
+
+        def timed(number):
+            clock = time.perf_counter
+            total = 0.0
+            for _ in range(number):
+                prepare()
+                start = clock()
+                func()
+                total += clock() - start
+            return total
+
+    # Grow a trial run until it is long enough to time, as Timer.autorange
+    # does, then scale the count so each repeat takes about min_time
+    number = 1
+    while True:
+        elapsed = timed(number)
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, math.ceil(number * min_time / elapsed))
+    best = min(timed(number) for _ in range(repeat))
+    return best / (number * ops)
+
+
+def run(names=None, repeat=5):
+    """Run the selected benchmarks and return their results"""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        func, ops, *prepare = setup()
+        seconds = measure(func, ops, repeat, prepare=prepare[0] if prepare else None)
+        results[name] = {"seconds_per_op": seconds, "ops_per_sec": 1 / seconds}
+        print(f"{name:56s} {seconds * 1e6:12.3f} us/op {1 / seconds:14,.0f} ops/s")
+    return results
+
+
+def save(results, path):
+    """Write results and the machine they ran on to a JSON baseline"""
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def compare(results, path, threshold):
+    """Compare results with a baseline and return the names that regressed"""
+    with open(path) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    print(f"\n{'benchmark':56s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["seconds_per_op"]
+        after = result["seconds_per_op"]
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:56s} {before * 1e6:10.3f}us {after * 1e6:10.3f}us "
+            f"{change:+8.1%}{flag}"
+        )
+    return regressions
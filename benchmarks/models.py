@@ -0,0 +1,146 @@
+"""Micro-benchmarks for the pygame-free game model"""
+
+import random
+
+from src.models.game_state import GameState
+from src.models.piece import Piece
+from src.utils.constants import CELL_SIZE, PADDING, TITLE_HEIGHT, WINDOW_HEIGHT
+
+from .harness import benchmark
+
+SEED = 1234
+
+
+def _board_positions():
+    """Get pixel positions covering the board and a little beyond"""
+    return [
+        (PADDING + col * CELL_SIZE, TITLE_HEIGHT + row * CELL_SIZE)
+        for row in range(-1, 7)
+        for col in range(-1, 6)
+    ]
+
+
+@benchmark("model.is_valid_position")
+def bench_is_valid_position():
+    state = GameState()
+    pieces = state.available_pieces
+    positions = _board_positions()
+
+    def run():
+        for piece in pieces:
+            for x, y in positions:
+                state.is_valid_position(piece, x, y)
+
+    return run, len(pieces) * len(positions)
+
+
+@benchmark("model.snap_position")
+def bench_snap_position():
+    """Nearest legal cell for drops a third of a cell off the grid"""
+    state = GameState()
+    pieces = state.available_pieces
+    positions = [
+        (x + CELL_SIZE // 3, y - CELL_SIZE // 3) for x, y in _board_positions()
+    ]
+
+    def run():
+        for piece in pieces:
+            for x, y in positions:
+                state.snap_position(piece, x, y)
+
+    return run, len(pieces) * len(positions)
+
+
+@benchmark("model.place_piece")
+def bench_place_piece():
+    state = GameState()
+    piece = Piece(kind=state.available_pieces[6].kind)  # Horizontal line
+    row_count = 5
+    x = PADDING
+
+    def run():
+        for row in range(1, 1 + row_count):
+            state.place_piece(piece, x, TITLE_HEIGHT + row * CELL_SIZE)
+
+    # Clearing the board between runs is timed on its own below
+    return run, row_count, state.reset_board
+
+
+@benchmark("model.reset_board")
+def bench_reset_board():
+    state = GameState()
+    piece = Piece(kind=state.available_pieces[6].kind)
+
+    def fill():
+        for row in range(1, 6):
+            state.place_piece(piece, PADDING, TITLE_HEIGHT + row * CELL_SIZE)
+
+    return state.reset_board, 1, fill
+
+
+@benchmark("model.check_win")
+def bench_check_win():
+    state = GameState()
+    state.available_pieces = []
+
+    def run():
+        for _ in range(100):
+            state.check_win()
+
+    return run, 100
+
+
+@benchmark("model.rotate")
+def bench_rotate():
+    pieces = Piece.create_all_pieces()
+
+    def run():
+        for piece in pieces:
+            piece.rotate()
+
+    return run, len(pieces)
+
+
+@benchmark("model.get_piece_at_position")
+def bench_get_piece_at_position():
+    state = GameState()
+    rng = random.Random(SEED)
+    clicks = [
+        (rng.randrange(0, 500), rng.randrange(WINDOW_HEIGHT + TITLE_HEIGHT, 650))
+        for _ in range(100)
+    ]
+
+    def run():
+        for x, y in clicks:
+            state.get_piece_at_position(x, y)
+
+    return run, len(clicks)
+
+
+@benchmark("model.undo_redo")
+def bench_undo_redo():
+    """Step back and forward through a full game of history"""
+    state = GameState()
+    pieces = list(state.available_pieces)
+    for piece in pieces:
+        for row in range(state.bits.height):
+            col = next(
+                (
+                    col
+                    for col in range(state.bits.width)
+                    if state.can_place(piece, row, col)
+                ),
+                None,
+            )
+            if col is not None:
+                state.play(piece, row, col)
+                break
+    moves = state.history.move
+
+    def run():
+        while state.undo():
+            pass
+        while state.redo():
+            pass
+
+    return run, 2 * moves
@@ -0,0 +1,55 @@
+"""Frame time of Board.display on SDL's dummy video driver"""
+
+import os
+
+from .harness import benchmark
+
+FRAMES = 50
+
+
+def _board():
+    """Create a Board drawing into an off-screen dummy window"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from src.models.board import Board
+
+    return Board(initialize_pygame=True)
+
+
+@benchmark("render.display_idle")
+def bench_display_idle():
+    board = _board()
+    board.display()
+
+    def run():
+        for _ in range(FRAMES):
+            board.display()
+
+    return run, FRAMES
+
+
+@benchmark("render.display_drag")
+def bench_display_drag():
+    board = _board()
+    board.selected_piece = board.available_pieces[2]
+    board.dragging = True
+    path = [(100 + step * 6, 120 + step * 5) for step in range(FRAMES)]
+
+    def run():
+        for pos in path:
+            board.drag_pos = pos
+            board.display()
+
+    return run, FRAMES
+
+
+@benchmark("render.display_scroll")
+def bench_display_scroll():
+    board = _board()
+
+    def run():
+        for frame in range(FRAMES):
+            board.scroll_offset = board.target_scroll = (frame * 15) % 300
+            board.display()
+
+    return run, FRAMES
@@ -0,0 +1,114 @@
+"""Cost of the model and drawing as the board area grows
+
+Rectangular boards tiled with copies of the stock tetrominoes cover a
+range of areas; the shipped puzzles add the stock board and the
+pentomino boards, which are also solved.
+"""
+
+import os
+
+from src.models.game_state import GameState
+from src.models.piece import STOCK_SHAPES
+from src.models.puzzle import Puzzle, get_puzzle
+from src.models.solver import Solver
+from src.utils.constants import PIECE_COLORS
+
+from .harness import benchmark
+
+# (columns, rows) of the synthetic boards
+SIZES = ((4, 4), (8, 8), (12, 10), (16, 16))
+
+
+def _tetromino_board(width, height):
+    """Get a puzzle of a full rectangle and enough stock pieces to cover it"""
+    pieces = [(name, shape, PIECE_COLORS[name]) for name, shape in STOCK_SHAPES] * (
+        width * height // 28 + 1
+    )
+    return Puzzle(
+        f"tetromino_{width}x{height}", width, height, pieces[: width * height // 4]
+    )
+
+
+def _puzzles():
+    puzzles = [_tetromino_board(width, height) for width, height in SIZES]
+    puzzles += [get_puzzle(name) for name in ("classic", "pentomino_6x10")]
+    return sorted(puzzles, key=lambda puzzle: bin(puzzle.playable).count("1"))
+
+
+def _label(puzzle):
+    return f"scaling.{bin(puzzle.playable).count('1'):03d}cells.{puzzle.name}"
+
+
+def _register(puzzle):
+    label = _label(puzzle)
+
+    @benchmark(f"{label}.is_valid_position")
+    def bench_valid():
+        state = GameState(puzzle)
+        layout = state.layout
+        piece = state.available_pieces[0]
+        positions = [
+            (
+                layout.padding + col * layout.cell_size,
+                layout.title_height + row * layout.cell_size,
+            )
+            for row in range(puzzle.height)
+            for col in range(puzzle.width)
+        ]
+
+        def run():
+            for x, y in positions:
+                state.is_valid_position(piece, x, y)
+
+        return run, len(positions)
+
+    @benchmark(f"{label}.check_win")
+    def bench_win():
+        state = GameState(puzzle)
+        state.available_pieces = []
+        return state.check_win, 1
+
+    @benchmark(f"{label}.reset_board")
+    def bench_reset():
+        state = GameState(puzzle)
+        return state.reset_board, 1
+
+    @benchmark(f"{label}.strip_hit_test")
+    def bench_hit_test():
+        state = GameState(puzzle)
+        layout = state.layout
+        state.scroll_offset = state.scroll_limit() // 2
+        y = layout.strip_piece_top + layout.cell_size // 2
+        clicks = [(x, y) for x in range(0, layout.window_width, 7)]
+
+        def run():
+            for x, y in clicks:
+                state.get_piece_at_position(x, y)
+
+        return run, len(clicks)
+
+    @benchmark(f"{label}.display")
+    def bench_display():
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from src.models.board import Board
+
+        board = Board(initialize_pygame=True, puzzle=puzzle)
+        board.display()
+
+        def run():
+            # Force the cached background to be redrawn, as after a placement
+            board.grid_version += 1
+            board.display()
+
+        return run, 1
+
+    if not puzzle.name.startswith("tetromino_"):
+
+        @benchmark(f"{label}.solve_first")
+        def bench_solve():
+            state = GameState(puzzle)
+            return (lambda: Solver.from_board(state).solve()), 1
+
+
+for _puzzle in _puzzles():
+    _register(_puzzle)
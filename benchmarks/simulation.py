@@ -0,0 +1,241 @@
+"""Throughput of whole games and solver runs on the headless model"""
+
+import importlib.util
+import os
+import random
+import tempfile
+
+from src.models import move_log
+from src.models.game_state import GameState
+from src.models.hint_worker import _solve
+from src.models.solution_db import SolutionDB, write
+from src.models.solver import Solver, _matrix
+from src.models.symmetry import unique_solutions
+from src.tools import server
+
+from .harness import benchmark
+
+SEED = 1234
+GAMES = 50
+
+
+def play_random_game(state, rng):
+    """Play random pieces at random legal cells until stuck or won"""
+    state.new_game()
+    while state.available_pieces:
+        piece = rng.choice(state.available_pieces)
+        for _ in range(rng.randrange(4)):
+            state.rotate_piece(piece)
+        moves = [
+            (row, col)
+            for row in range(state.bits.height)
+            for col in range(state.bits.width)
+            if state.can_place(piece, row, col)
+        ]
+        if not moves:
+            break
+        state.play(piece, *rng.choice(moves))
+    return state.check_win()
+
+
+@benchmark("simulation.random_games")
+def bench_random_games():
+    state = GameState()
+
+    def run():
+        rng = random.Random(SEED)
+        for _ in range(GAMES):
+            play_random_game(state, rng)
+
+    return run, GAMES
+
+
+@benchmark("simulation.solved_games")
+def bench_solved_games():
+    """Replay every solution of the stock board move by move"""
+    state = GameState()
+    solutions = list(Solver.from_board(state).solutions())
+
+    def run():
+        for solution in solutions:
+            state.new_game()
+            pieces = list(state.available_pieces)
+            for placement in solution:
+                piece = pieces[placement.piece]
+                while piece.orientation != placement.orientation:
+                    state.rotate_piece(piece)
+                state.play(piece, placement.row, placement.col)
+            assert state.has_won
+
+    return run, len(solutions)
+
+
+@benchmark("solver.first_solution")
+def bench_solver_first():
+    state = GameState()
+
+    def run():
+        Solver.from_board(state).solve()
+
+    return run, 1
+
+
+@benchmark("solver.first_solution_cold")
+def bench_solver_first_cold():
+    """First solution including a matrix build nothing has cached yet"""
+    state = GameState()
+
+    def run():
+        _matrix.cache_clear()
+        Solver.from_board(state).solve()
+
+    return run, 1
+
+
+@benchmark("solver.count_all")
+def bench_solver_count():
+    state = GameState()
+    solver = Solver.from_board(state)
+    return solver.count, 1
+
+
+@benchmark("solver.unique_solutions")
+def bench_solver_unique():
+    state = GameState()
+
+    def run():
+        unique_solutions(state.grid, state.available_pieces)
+
+    return run, 1
+
+
+def _partial_boards():
+    """Game states after each move but the last of every stock solution"""
+    base = GameState()
+    boards = []
+    for solution in Solver.from_board(base).solutions():
+        for moves in range(len(solution)):
+            state = GameState(base.puzzle)
+            for placement in solution[:moves]:
+                piece = state.pieces[placement.piece]
+                piece.orientation = placement.orientation
+                state.play(piece, placement.row, placement.col)
+            boards.append(state)
+    return boards
+
+
+@benchmark("solver.hint_search")
+def bench_hint_search():
+    """Hints found by searching, as the hint worker does"""
+    boards = _partial_boards()
+    puzzle = boards[0].puzzle
+    jobs = [
+        (
+            state.bits.occupied,
+            [puzzle.kinds.index(piece.kind) for piece in state.available_pieces],
+        )
+        for state in boards
+    ]
+
+    def run():
+        for occupied, kinds in jobs:
+            _solve(puzzle, occupied, kinds, None)
+
+    return run, len(jobs)
+
+
+@benchmark("solver.hint_database")
+def bench_hint_database():
+    """Hints looked up in a solution database for the same boards"""
+    boards = _partial_boards()
+    path = os.path.join(tempfile.mkdtemp(), "classic.tpsd")
+    write(boards[0].puzzle, path)
+    database = SolutionDB(path)
+
+    def run():
+        for state in boards:
+            database.hint(state)
+
+    return run, len(boards)
+
+
+@benchmark("simulation.replay_logs")
+def bench_replay_logs():
+    """Decode and replay a move log of every stock solution"""
+    state = GameState()
+    logs = []
+    for solution in Solver.from_board(state).solutions():
+        data = bytearray(move_log.header("classic"))
+        remaining = list(range(len(state.available_pieces)))
+        for placement in solution:
+            index = remaining.index(placement.piece)
+            data += move_log.encode(move_log.SELECT, 0, (index,))
+            for _ in range(placement.orientation):
+                data += move_log.encode(move_log.ROTATE, 120, (index,))
+            data += move_log.encode(
+                move_log.PLACE, 800, (index, placement.row, placement.col)
+            )
+            remaining.remove(placement.piece)
+        logs.append(bytes(data))
+
+    def run():
+        for data in logs:
+            _, events = move_log.decode(data)
+            move_log.replay(state, events)
+            assert state.has_won
+
+    return run, len(logs)
+
+
+@benchmark("simulation.server_commands")
+def bench_server_commands():
+    """Random commands spread over 1000 hosted sessions, without the socket"""
+    host = server.SessionServer()
+    sessions = [
+        server.RESPONSE.unpack(host.handle(server.OPEN, 0, (), 0.0))[1]
+        for _ in range(1000)
+    ]
+    rng = random.Random(SEED)
+    commands = []
+    for _ in range(10_000):
+        session = rng.choice(sessions)
+        if rng.random() < 0.3:
+            commands.append((move_log.ROTATE, session, (0,)))
+        else:
+            commands.append(
+                (move_log.PLACE, session, (0, rng.randrange(6), rng.randrange(5)))
+            )
+    resets = [(move_log.RESET, session, ()) for session in sessions]
+
+    def run():
+        handle = host.handle
+        for op, session, args in resets:
+            handle(op, session, args, 1.0)
+        for op, session, args in commands:
+            handle(op, session, args, 1.0)
+
+    return run, len(resets) + len(commands)
+
+
+def bench_batch_env():
+    """Random play on 4096 stock boards at once"""
+    import numpy as np
+
+    from src.models.batch_env import BatchEnv
+
+    env = BatchEnv(4096)
+    rng = np.random.default_rng(SEED)
+    steps = 100
+
+    def run():
+        for _ in range(steps):
+            actions = env.random_actions(rng)
+            env.step(actions)
+            env.reset((actions < 0) | env.is_won())
+
+    return run, steps * env.count
+
+
+# The batch environment needs the optional NumPy dependency
+if importlib.util.find_spec("numpy") is not None:
+    benchmark("simulation.batch_env_steps")(bench_batch_env)
@@ -1,8 +1,82 @@
+import time
+
+# Taken before anything else is imported, for --startup-report
+_START = time.perf_counter()
+
+import argparse
+
 from src.ui.game import Game
+from src.utils.constants import FPS
 
 def main():
     """Entry point for the Tetris Puzzle game"""
-    game = Game()
+    parser = argparse.ArgumentParser(description="Tetris Puzzle")
+    parser.add_argument("--puzzle", metavar="NAME_OR_FILE",
+                        help="built-in puzzle name or puzzle JSON file (default: classic)")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="frame rate cap, 0 for uncapped (default %(default)s)")
+    parser.add_argument("--no-idle", action="store_true",
+                        help="redraw every frame instead of sleeping while idle")
+    parser.add_argument("--no-hints", action="store_true",
+                        help="don't run the background solver for hints")
+    parser.add_argument("--solutions", metavar="FILE",
+                        help="answer hints from a solution database instead of solving")
+    parser.add_argument("--record", metavar="FILE",
+                        help="log every move to a binary file for replay")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long import, init and the first frame took")
+    parser.add_argument("--quit-after-first-frame", action="store_true",
+                        help="exit once the first frame is drawn (for timing startup)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every frame; F3 toggles the timing overlay")
+    parser.add_argument("--profile-csv", metavar="FILE",
+                        help="write per-frame timings to a CSV file (implies --profile)")
+    parser.add_argument("--cprofile-frames", type=int, default=0, metavar="N",
+                        help="run cProfile over the first N frames (implies --profile)")
+    parser.add_argument("--cprofile-out", default="frames.prof", metavar="FILE")
+    args = parser.parse_args()
+
+    startup = None
+    if args.startup_report:
+        from src.ui.instrumentation import StartupTimer
+        startup = StartupTimer(_START)
+        startup.mark("import")
+
+    profiler = None
+    if args.profile or args.profile_csv or args.cprofile_frames:
+        from src.ui.instrumentation import FrameProfiler
+        profiler = FrameProfiler(csv_path=args.profile_csv,
+                                 cprofile_frames=args.cprofile_frames,
+                                 cprofile_path=args.cprofile_out)
+
+    puzzle = None
+    if args.puzzle:
+        from src.models.puzzle import get_puzzle
+        puzzle = get_puzzle(args.puzzle)
+
+    solutions = None
+    if args.solutions:
+        from src.models.puzzle import get_puzzle
+        from src.models.solution_db import SolutionDB
+        solutions = SolutionDB(args.solutions)
+        if not solutions.matches(puzzle or get_puzzle()):
+            parser.error(f"{args.solutions} was built for a different puzzle "
+                         f"({solutions.puzzle.name})")
+
+    recorder = None
+    if args.record:
+        from src.models.move_log import MoveRecorder
+        from src.models.puzzle import get_puzzle
+        # The puzzle's own name, not the --puzzle argument, which may be a path
+        recorder = MoveRecorder(args.record, (puzzle or get_puzzle()).name)
+
+    game = Game(fps=args.fps, idle=not args.no_idle, profiler=profiler, puzzle=puzzle,
+                hints=not args.no_hints, recorder=recorder, startup=startup,
+                solutions=solutions)
+    if startup is not None:
+        startup.mark("init")
+    if args.quit_after_first_frame:
+        game.quit_after_first_frame = True
     game.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+"""Many games stepped at once with NumPy, for automated play-testing
+
+BatchEnv keeps N boards of one puzzle as a (N, words) array of 64-bit
+occupancy words plus a (N,) mask of the pieces each board still has.
+Every placement of every piece is precomputed as one action, so
+legal_actions, step and is_won are array operations over the whole batch.
+Needs NumPy but not pygame.
+
+Legal moves are kept as a (N, actions) bool array that only ever loses
+entries during a game, so a step just clears the actions that clash with
+the one played, using a precomputed (actions, actions) compatibility table.
+
+An action indexes BatchEnv.actions, which describes it as
+(piece, orientation, row, col), where piece is the position of the piece
+in the puzzle's piece set.
+"""
+
+import numpy as np
+
+from .piece import KINDS
+from .puzzle import get_puzzle
+from .solver import Placement
+
+
+def _to_words(mask, words):
+    """Split a cell mask into 64-bit words, lowest cells first"""
+    return [(mask >> (64 * word)) & 0xFFFFFFFFFFFFFFFF for word in range(words)]
+
+
+class BatchEnv:
+    """A batch of boards of one puzzle with vectorized moves"""
+
+    def __init__(self, count, puzzle=None):
+        self.puzzle = puzzle if puzzle is not None else get_puzzle()
+        self.count = count
+        self.words = -(-(self.puzzle.width * self.puzzle.height) // 64)
+        pieces = self.puzzle.create_pieces()
+        if len(pieces) > 63:
+            raise ValueError("BatchEnv supports at most 63 pieces per puzzle")
+
+        # Every (piece, orientation, anchor) on the empty board is one action
+        actions = []
+        masks = []
+        for index, piece in enumerate(pieces):
+            for orientation in range(len(KINDS[piece.kind].orientations)):
+                for anchor in self.puzzle.anchors(piece.kind, orientation):
+                    actions.append(
+                        Placement(
+                            index, orientation, anchor.row, anchor.col, anchor.mask
+                        )
+                    )
+                    masks.append(_to_words(anchor.mask, self.words))
+        self.actions = actions
+        self.action_masks = np.array(masks, dtype=np.uint64).reshape(-1, self.words)
+        self.action_pieces = np.array([a.piece for a in actions], dtype=np.uint64)
+        self.action_bits = np.left_shift(np.uint64(1), self.action_pieces)
+
+        self._compatible = self._compatibility()
+
+        self.playable = np.array(
+            _to_words(self.puzzle.playable, self.words), dtype=np.uint64
+        )
+        self.all_pieces = np.uint64((1 << len(pieces)) - 1)
+
+        self.occupied = np.zeros((count, self.words), dtype=np.uint64)
+        self.remaining = np.full(count, self.all_pieces, dtype=np.uint64)
+        self.legal = np.ones((count, len(actions)), dtype=bool)
+
+    def _compatibility(self, chunk=256):
+        """Get which pairs of actions can both be played: other pieces, no shared cell"""
+        masks = self.action_masks
+        pieces = self.action_pieces
+        compatible = np.empty((len(masks), len(masks)), dtype=bool)
+        for start in range(0, len(masks), chunk):
+            block = masks[start : start + chunk]
+            overlap = ((block[:, None, :] & masks[None, :, :]) != 0).any(axis=2)
+            same_piece = pieces[start : start + chunk, None] == pieces[None, :]
+            compatible[start : start + chunk] = ~(overlap | same_piece)
+        return compatible
+
+    @property
+    def action_count(self):
+        return len(self.actions)
+
+    def reset(self, boards=None):
+        """Empty every board, or only the boards selected by an index or bool array"""
+        if boards is None:
+            boards = slice(None)
+        self.occupied[boards] = 0
+        self.remaining[boards] = self.all_pieces
+        self.legal[boards] = True
+
+    def legal_actions(self):
+        """Get the (N, actions) bool array of the moves each board allows
+
+        This is the live array; copy it before changing it.
+        """
+        return self.legal
+
+    def step(self, actions):
+        """Play one action per board; boards given -1 are left alone
+
+        Illegal moves are ignored. Returns the bool array of boards whose
+        move was played.
+        """
+        actions = np.asarray(actions)
+        index = np.where(actions >= 0, actions, 0)
+        played = (actions >= 0) & self.legal[np.arange(self.count), index]
+        self.occupied |= np.where(
+            played[:, None], self.action_masks[index], np.uint64(0)
+        )
+        self.remaining &= ~np.where(played, self.action_bits[index], np.uint64(0))
+        self.legal[played] &= self._compatible[index[played]]
+        return played
+
+    def is_won(self):
+        """Get the bool array of boards with every piece placed"""
+        return (self.remaining == 0) & (self.occupied == self.playable).all(axis=1)
+
+    def random_actions(self, rng, tries=8):
+        """Pick a uniformly random legal action per board, -1 where there is none
+
+        A few random actions are tried per board first; boards where all of
+        them are illegal pick the k-th of their legal actions instead.
+        """
+        legal = self.legal
+        boards = np.arange(self.count)
+        candidates = rng.integers(0, legal.shape[1], (self.count, tries))
+        hits = legal[boards[:, None], candidates]
+        found = hits.any(axis=1)
+        actions = np.where(found, candidates[boards, hits.argmax(axis=1)], -1)
+
+        rest = np.flatnonzero(~found)
+        if rest.size:
+            rows = legal[rest]
+            totals = rows.sum(axis=1)
+            picks = (rng.random(rest.size) * totals).astype(np.int64)
+            # The k-th legal action has exactly k legal actions before it
+            chosen = (rows.cumsum(axis=1) <= picks[:, None]).sum(axis=1)
+            actions[rest] = np.where(totals > 0, chosen, -1)
+        return actions
+
+    def grids(self):
+        """Unpack the occupancy into a (N, height, width) bool array"""
+        cells = self.puzzle.width * self.puzzle.height
+        as_bytes = self.occupied.astype("<u8").view(np.uint8).reshape(self.count, -1)
+        bits = np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :cells]
+        return bits.reshape(self.count, self.puzzle.height, self.puzzle.width).astype(
+            bool
+        )
@@ -0,0 +1,111 @@
+from ..utils.constants import BOARD_HEIGHT, BOARD_WIDTH
+
+
+def cell_bit(row, col, width=BOARD_WIDTH):
+    """Get the bit for a board cell (cells are numbered row by row)"""
+    return 1 << (row * width + col)
+
+
+def shape_mask(shape, width=BOARD_WIDTH):
+    """Convert a piece shape into a mask anchored at the top-left cell"""
+    mask = 0
+    for row, cells in enumerate(shape):
+        for col, filled in enumerate(cells):
+            if filled:
+                mask |= cell_bit(row, col, width)
+    return mask
+
+
+def grid_masks(grid):
+    """Get the (playable, occupied) masks of a board grid"""
+    width = len(grid[0])
+    playable = occupied = 0
+    for row, cells in enumerate(grid):
+        for col, cell in enumerate(cells):
+            if cell is not None:
+                bit = cell_bit(row, col, width)
+                playable |= bit
+                if cell != 0:
+                    occupied |= bit
+    return playable, occupied
+
+
+# Orientation masks anchored at cell (0, 0), keyed on (kind, orientation, width)
+_piece_masks = {}
+
+
+def piece_mask(piece, width=BOARD_WIDTH):
+    """Get the mask of a piece's current orientation anchored at the top-left cell"""
+    key = (piece.kind, piece.orientation, width)
+    mask = _piece_masks.get(key)
+    if mask is None:
+        mask = _piece_masks[key] = sum(
+            cell_bit(row, col, width) for row, col in piece.cells
+        )
+    return mask
+
+
+class BitBoard:
+    """Board occupancy stored as integer masks"""
+
+    def __init__(self, playable, occupied=0, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        self.width = width
+        self.height = height
+        self.playable = playable
+        self.occupied = occupied
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Build a bitboard from a grid of colours, zeros and None cells"""
+        playable, occupied = grid_masks(grid)
+        return cls(playable, occupied, len(grid[0]), len(grid))
+
+    def placement_mask(self, piece, row, col):
+        """Get the piece mask shifted to the given cell, or None if out of bounds"""
+        if (
+            row < 0
+            or col < 0
+            or row + piece.height > self.height
+            or col + piece.width > self.width
+        ):
+            return None
+        return piece_mask(piece, self.width) << (row * self.width + col)
+
+    def place(self, mask):
+        """Fill the cells of the mask"""
+        self.occupied |= mask
+
+    def is_full(self):
+        """Check if every playable cell is filled"""
+        return self.occupied == self.playable
+
+
+def column_masks(width, height):
+    """Get the masks of the first and last board columns"""
+    first = sum(cell_bit(row, 0, width) for row in range(height))
+    return first, first << (width - 1)
+
+
+def regions(free, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+    """Split a mask into its edge-connected regions by flood fill"""
+    first_col, last_col = column_masks(width, height)
+    # Cells allowed to receive a fill moving right / left
+    from_left = free & ~first_col
+    from_right = free & ~last_col
+    result = []
+    while free:
+        region = free & -free
+        while True:
+            grown = (
+                region
+                | ((region << 1) & from_left)
+                | ((region >> 1) & from_right)
+                | ((region << width) & free)
+                | ((region >> width) & free)
+            )
+            if grown == region:
+                break
+            region = grown
+        result.append(region)
+        free &= ~region
+    return result
@@ -1,342 +1,209 @@
-import pygame
-from .piece import Piece
-from ..utils.constants import (
-    CELL_SIZE, GRID_COLOR, BG_COLOR, EMPTY_COLOR,
-    SELECTION_HEIGHT, TITLE_HEIGHT, PADDING, BOTTOM_PADDING,
-    BUTTON_PADDING, BUTTON_RADIUS, BUTTON_COLOR, BUTTON_HOVER_COLOR,
-    WINDOW_WIDTH, WINDOW_HEIGHT, BOARD_WIDTH, BOARD_HEIGHT
-)
+from .game_state import GameState
+from .piece import KINDS
 
-class Board:
-    def __init__(self, initialize_pygame=True):
-        # Non-pygame dependent initialization
-        self.dragging = False
-        self.selected_piece = None
-        self.drag_pos = None
-        self.has_won = False
+class Board(GameState):
+    """Game state plus its pygame window; pygame is only imported when drawing"""
+
+    def __init__(self, initialize_pygame=True, puzzle=None):
+        super().__init__(puzzle)
         self.reset_button_rect = None
         self.reset_hover = False
         
-        # Initial pieces list (store for reset)
-        self.initial_pieces = Piece.create_all_pieces()
-        
-        # Reset the board to initial state
-        self.reset_board()
+        # Background solver results (see models/hint_worker.py)
+        self.hints_enabled = False
+        self.solvable = None
+        self.hint = None
+        self.show_hint = False
         
         if initialize_pygame:
-            # Initialize Pygame
-            pygame.init()
+            import pygame
+            from ..ui.instrumentation import NULL_PROFILER
+            from ..ui.render_cache import RenderCache
+
+            # Start only the subsystems the game uses (no audio or joysticks)
+            pygame.display.init()
+            pygame.font.init()
             
             # Initialize display
-            self.screen = pygame.display.set_mode(
-                (WINDOW_WIDTH, WINDOW_HEIGHT + SELECTION_HEIGHT + TITLE_HEIGHT)
-            )
+            self.screen = pygame.display.set_mode(self.layout.screen_size)
             pygame.display.set_caption("Tetris Puzzle")
             
-            # Initialize fonts
-            self.title_font = pygame.font.Font(None, 60)
-            self.button_font = pygame.font.Font(None, 36)
-            self.win_font = pygame.font.Font(None, 74)
-
-        # Add scroll variables
-        self.scroll_offset = 0
-        self.target_scroll = 0
-        self.scroll_speed = 15  # Pixels per frame
-        self.max_scroll = 0
-
-    def reset_board(self):
-        """Reset the board to its initial state"""
-        # Reset grid
-        self.grid = [
-            [None, 0, 0, 0, None],    # Top row with corners missing
-            [0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0]           # Now 6 rows
-        ]
-        # Reset available pieces
-        self.available_pieces = Piece.create_all_pieces()
-        self.dragging = False
-        self.selected_piece = None
-        self.has_won = False
-
-    def is_valid_position(self, piece, start_x, start_y):
-        """Check if a piece can be placed at the given position"""
-        # Convert pixel coordinates to grid coordinates
-        grid_x = (start_x - PADDING) // CELL_SIZE
-        grid_y = (start_y - TITLE_HEIGHT) // CELL_SIZE
-        
-        # Check each cell of the piece
-        for row in range(piece.height):
-            for col in range(piece.width):
-                if piece.shape[row][col]:
-                    board_row = grid_y + row
-                    board_col = grid_x + col
-                    
-                    # Check bounds
-                    if (board_row < 0 or board_row >= BOARD_HEIGHT or
-                        board_col < 0 or board_col >= BOARD_WIDTH or
-                        self.grid[board_row][board_col] is None or
-                        self.grid[board_row][board_col] != 0):
-                        return False
-        return True
-
-    def place_piece(self, piece, x, y):
-        """Place a piece on the board at the given position"""
-        grid_x = (x - PADDING) // CELL_SIZE
-        grid_y = (y - TITLE_HEIGHT) // CELL_SIZE
-        
-        # Place each cell of the piece
-        for row in range(piece.height):
-            for col in range(piece.width):
-                if piece.shape[row][col]:
-                    self.grid[grid_y + row][grid_x + col] = piece.color
-
-    def get_piece_at_position(self, x, y):
-        """Get the piece at the given selection area position"""
-        if y < WINDOW_HEIGHT + TITLE_HEIGHT:  # Check if click is above selection area
-            return None
-            
-        # Calculate total width of all pieces
-        total_pieces_width = sum((piece.width + 1) * CELL_SIZE for piece in self.available_pieces) - CELL_SIZE
-        
-        # Calculate piece positions with scroll offset
-        piece_x = PADDING - self.scroll_offset
-        
-        # Check each piece's bounds
-        for piece in self.available_pieces:
-            piece_width = piece.width * CELL_SIZE
-            piece_height = piece.height * CELL_SIZE
+            # Pre-rendered text, sprites and overlays; fonts load on first use
+            self.render_cache = RenderCache(self.layout)
+            self.reset_button_rect = self.render_cache.button_rect
             
-            # Define piece bounds in selection area
-            piece_bounds = pygame.Rect(
-                piece_x,
-                WINDOW_HEIGHT + TITLE_HEIGHT + 20,
-                piece_width,
-                piece_height
-            )
+            # What the last frame showed, to work out the dirty rectangles
+            self._frame_state = None
+            self._strip_state = None
+            self._drawn_hover = False
+            self._drag_rect = None
             
-            # Check if click is within piece bounds
-            if piece_bounds.collidepoint(x, y):
-                return piece
-                
-            piece_x += (piece.width + 1) * CELL_SIZE
-        
-        return None
+            # Frame timing, a no-op unless Game turns instrumentation on
+            self.profiler = NULL_PROFILER
+
+    def invalidate(self):
+        """Push the whole window on the next frame"""
+        self._frame_state = None
 
     def display(self):
         """Draw the game state"""
-        # Fill background
-        self.screen.fill(BG_COLOR)
-        
-        # Draw title
-        title_surface = self.title_font.render("TETRIS", True, (255, 255, 255))
-        title_rect = title_surface.get_rect(center=(WINDOW_WIDTH // 2, TITLE_HEIGHT // 2))
-        self.screen.blit(title_surface, title_rect)
-        
-        # Draw reset button
-        button_surface = self.button_font.render("Reset", True, (255, 255, 255))
-        button_text_rect = button_surface.get_rect()
-        
-        # Create button rectangle with padding
-        self.reset_button_rect = pygame.Rect(
-            WINDOW_WIDTH - button_text_rect.width - BUTTON_PADDING * 3,
-            BUTTON_PADDING,
-            button_text_rect.width + BUTTON_PADDING * 2,
-            button_text_rect.height + BUTTON_PADDING
-        )
-        
-        # Draw button with hover effect
-        button_color = BUTTON_HOVER_COLOR if self.reset_hover else BUTTON_COLOR
-        pygame.draw.rect(self.screen, button_color, self.reset_button_rect, border_radius=BUTTON_RADIUS)
-        
-        # Center text on button
-        button_text_rect.center = self.reset_button_rect.center
-        self.screen.blit(button_surface, button_text_rect)
+        import pygame
+        cache = self.render_cache
+        profiler = self.profiler
+        layout = self.layout
         
-        # Draw board grid
-        for row in range(len(self.grid)):
-            for col in range(len(self.grid[0])):
-                x = col * CELL_SIZE + PADDING
-                y = row * CELL_SIZE + TITLE_HEIGHT
-                
-                if self.grid[row][col] is not None:
-                    # Draw cell
-                    color = self.grid[row][col] if self.grid[row][col] != 0 else EMPTY_COLOR
-                    pygame.draw.rect(self.screen, color,
-                                  (x, y, CELL_SIZE, CELL_SIZE))
-                    # Draw cell border
-                    pygame.draw.rect(self.screen, GRID_COLOR,
-                                  (x, y, CELL_SIZE, CELL_SIZE), 1)
-        
-        # Draw selection area
-        pygame.draw.rect(self.screen, (40, 40, 40),
-                        pygame.Rect(0, WINDOW_HEIGHT + TITLE_HEIGHT,
-                                  WINDOW_WIDTH, SELECTION_HEIGHT))
-        pygame.draw.line(self.screen, GRID_COLOR,
-                        (0, WINDOW_HEIGHT + TITLE_HEIGHT),
-                        (WINDOW_WIDTH, WINDOW_HEIGHT + TITLE_HEIGHT), 2)
-        
-        # Calculate total width of all pieces
-        total_pieces_width = sum((piece.width + 1) * CELL_SIZE for piece in self.available_pieces) - CELL_SIZE
-        
-        # Create clipping rect for selection area (now using full width)
-        selection_rect = pygame.Rect(0, WINDOW_HEIGHT + TITLE_HEIGHT,
-                                   WINDOW_WIDTH, SELECTION_HEIGHT)
-        self.screen.set_clip(selection_rect)
+        # Advance the scroll first so the frame that reaches the target is drawn
+        self.update_scroll()
         
-        # Draw available pieces in selection area with scroll offset
-        piece_x = PADDING - self.scroll_offset
+        # Static background (title, board cells, selection area) and button
+        with profiler.section("background"):
+            self.screen.blit(cache.background(self.grid, self.grid_version), (0, 0))
+        with profiler.section("button"):
+            self.screen.blit(cache.button_surfaces[self.reset_hover], cache.button_rect)
         
-        for piece in self.available_pieces:
-            if piece == self.selected_piece and self.dragging:
-                piece_x += (piece.width + 1) * CELL_SIZE
-                continue
+        with profiler.section("strip"):
+            # Create clipping rect for selection area (now using full width)
+            selection_rect = cache.strip_rect()
+            self.screen.set_clip(selection_rect)
             
-            for row in range(piece.height):
-                for col in range(piece.width):
-                    if piece.shape[row][col]:
-                        x = piece_x + col * CELL_SIZE
-                        y = WINDOW_HEIGHT + TITLE_HEIGHT + 20 + row * CELL_SIZE
-                        
-                        # Only draw if within the window
-                        if 0 <= x < WINDOW_WIDTH:
-                            pygame.draw.rect(self.screen, piece.color,
-                                          (x, y, CELL_SIZE, CELL_SIZE))
-                            pygame.draw.rect(self.screen, GRID_COLOR,
-                                          (x, y, CELL_SIZE, CELL_SIZE), 1)
+            # Draw only the available pieces that overlap the window
+            strip = self.strip
+            scroll = self.scroll_offset
+            piece_y = layout.strip_piece_top
+            hidden = self.selected_piece if self.dragging else None
             
-            piece_x += (piece.width + 1) * CELL_SIZE
-        
-        # Reset clipping
-        self.screen.set_clip(None)
-        
-        # Update scroll position
-        self.update_scroll()
+            # Pieces that fit nowhere on the board are greyed out
+            for index in strip.visible(scroll, layout.window_width):
+                piece = self.available_pieces[index]
+                if piece is not hidden:
+                    sprite = cache.piece_sprite(piece.kind, piece.orientation,
+                                                disabled=not self.has_moves(piece))
+                    self.screen.blit(sprite, (strip.starts[index] - scroll, piece_y))
+            
+            # Reset clipping
+            self.screen.set_clip(None)
+            strip_state = (scroll, hidden, strip.version)
+        
+        # Suggested move and solvability indicator
+        hint = self.hint if self.show_hint and not self.has_won else None
+        if self.hints_enabled:
+            with profiler.section("hint"):
+                self.screen.blit(cache.status_surfaces[self.solvable], cache.status_rect)
+                if hint is not None:
+                    self._draw_hint(hint)
         
         # Draw dragged piece
+        drag_rect = None
         if self.dragging and self.selected_piece and self.drag_pos:
-            self._draw_dragged_piece()
+            with profiler.section("drag"):
+                drag_rect = self._draw_dragged_piece()
         
         # Draw win message if game is won
         if self.has_won:
-            self._draw_win_message()
-        
-        pygame.display.flip()
-
-    def _draw_piece_in_selection(self, piece, x_pos):
-        """Draw a piece in the selection area"""
-        piece_width = piece.width * CELL_SIZE
-        piece_height = piece.height * CELL_SIZE
-        start_x = x_pos - piece_width // 2
-        start_y = WINDOW_HEIGHT + TITLE_HEIGHT + (SELECTION_HEIGHT - piece_height) // 2
-        
-        for row in range(piece.height):
-            for col in range(piece.width):
-                if piece.shape[row][col]:
-                    pygame.draw.rect(self.screen, piece.color,
-                                  (start_x + col * CELL_SIZE,
-                                   start_y + row * CELL_SIZE,
-                                   CELL_SIZE, CELL_SIZE))
+            with profiler.section("win"):
+                self._draw_win_message()
+        
+        # Timing overlay on top of everything else
+        hud_rect = None
+        if profiler.overlay_visible:
+            with profiler.section("hud"):
+                hud_rect = profiler.draw_overlay(self.screen)
+        
+        # Push only the parts of the window that changed since the last frame
+        with profiler.section("update"):
+            frame_state = (self.grid_version, self.has_won, self.solvable, hint)
+            if frame_state != self._frame_state:
+                pygame.display.update()
+            else:
+                dirty = []
+                if self.reset_hover != self._drawn_hover:
+                    dirty.append(cache.button_rect)
+                if strip_state != self._strip_state:
+                    dirty.append(selection_rect)
+                if drag_rect:
+                    dirty.append(drag_rect)
+                if self._drag_rect:
+                    dirty.append(self._drag_rect)
+                if hud_rect:
+                    dirty.append(hud_rect)
+                if dirty:
+                    pygame.display.update(dirty)
+        self._frame_state = frame_state
+        self._strip_state = strip_state
+        self._drawn_hover = self.reset_hover
+        self._drag_rect = drag_rect
 
     def _draw_dragged_piece(self):
-        """Draw the piece being dragged"""
+        """Draw the piece being dragged and return the area it covers"""
+        layout = self.layout
+        cell_size = layout.cell_size
         mouse_x, mouse_y = self.drag_pos
-        piece_width = self.selected_piece.width * CELL_SIZE
-        piece_height = self.selected_piece.height * CELL_SIZE
+        piece_width = self.selected_piece.width * cell_size
+        piece_height = self.selected_piece.height * cell_size
         start_x = mouse_x - piece_width // 2
         start_y = mouse_y - piece_height // 2
         
         # Define board boundaries
-        board_left = PADDING
-        board_right = PADDING + BOARD_WIDTH * CELL_SIZE
-        board_top = TITLE_HEIGHT
-        board_bottom = TITLE_HEIGHT + BOARD_HEIGHT * CELL_SIZE
+        board_left = layout.padding
+        board_right = layout.padding + layout.board_pixel_width
+        board_top = layout.title_height
+        board_bottom = layout.title_height + layout.board_pixel_height
         
         # Check if mouse is within board boundaries
         is_over_board = (board_left <= mouse_x <= board_right and 
                         board_top <= mouse_y <= board_bottom)
         
         # Draw the actual dragged piece with transparency
-        surface = pygame.Surface((piece_width, piece_height), pygame.SRCALPHA)
-        for row in range(self.selected_piece.height):
-            for col in range(self.selected_piece.width):
-                if self.selected_piece.shape[row][col]:
-                    color = (*self.selected_piece.color, 128)  # Semi-transparent
-                    pygame.draw.rect(surface, color,
-                                  (col * CELL_SIZE,
-                                   row * CELL_SIZE,
-                                   CELL_SIZE, CELL_SIZE))
-        self.screen.blit(surface, (start_x, start_y))
+        sprite = self.render_cache.piece_sprite(
+            self.selected_piece.kind, self.selected_piece.orientation, dragged=True)
+        area = self.screen.blit(sprite, (start_x, start_y))
         
         # Draw preview on board only if over the board
         if is_over_board:
-            grid_x = (start_x - PADDING) // CELL_SIZE
-            grid_y = (start_y - TITLE_HEIGHT) // CELL_SIZE
-            
-            # Check if position is valid
-            is_valid = self.is_valid_position(self.selected_piece, start_x, start_y)
+            # Show where a drop would snap to, or the cell under the piece in red
+            snapped = self.snap_position(self.selected_piece, start_x, start_y)
+            if snapped is not None:
+                grid_y, grid_x = snapped
+                preview_color = (0, 255, 0)
+            else:
+                grid_y, grid_x = layout.to_grid(start_x, start_y)
+                preview_color = (255, 0, 0)
             
             # Draw preview outline
-            preview_color = (0, 255, 0) if is_valid else (255, 0, 0)
-            for row in range(self.selected_piece.height):
-                for col in range(self.selected_piece.width):
-                    if self.selected_piece.shape[row][col]:
-                        x = (grid_x + col) * CELL_SIZE + PADDING
-                        y = (grid_y + row) * CELL_SIZE + TITLE_HEIGHT
-                        # Only draw preview if the cell would be on the board
-                        if (PADDING <= x < board_right and 
-                            TITLE_HEIGHT <= y < board_bottom):
-                            pygame.draw.rect(self.screen, preview_color,
-                                          (x, y, CELL_SIZE, CELL_SIZE), 2)
+            preview = self._draw_preview(self.selected_piece.cells, grid_y, grid_x,
+                                         preview_color)
+            if preview:
+                area.union_ip(preview)
+        return area
+
+    def _draw_preview(self, cells, grid_y, grid_x, color):
+        """Outline piece cells anchored at a grid cell and return the area drawn"""
+        import pygame
+        layout = self.layout
+        board_left = layout.padding
+        board_right = layout.padding + layout.board_pixel_width
+        board_top = layout.title_height
+        board_bottom = layout.title_height + layout.board_pixel_height
+        area = None
+        for row, col in cells:
+            x, y, _, _ = rect = layout.cell_rect(grid_y + row, grid_x + col)
+            # Only draw preview if the cell would be on the board
+            if (board_left <= x < board_right and 
+                board_top <= y < board_bottom):
+                drawn = pygame.draw.rect(self.screen, color, rect, 2)
+                area = drawn if area is None else area.union(drawn)
+        return area
+
+    def _draw_hint(self, hint):
+        """Outline the suggested move in the drag preview style"""
+        from ..ui.render_cache import HINT_COLOR
+        index, orientation, row, col = hint
+        kind = self.available_pieces[index].kind
+        cells = KINDS[kind].orientations[orientation].cells
+        return self._draw_preview(cells, row, col, HINT_COLOR)
 
     def _draw_win_message(self):
         """Draw the win message overlay"""
-        # Create semi-transparent overlay
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT + SELECTION_HEIGHT + TITLE_HEIGHT))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(128)
+        overlay, text, rect = self.render_cache.win_message()
         self.screen.blit(overlay, (0, 0))
-        
-        # Draw win message
-        win_text = self.win_font.render("Puzzle Complete!", True, (255, 255, 255))
-        win_rect = win_text.get_rect(center=(WINDOW_WIDTH // 2, (WINDOW_HEIGHT + TITLE_HEIGHT) // 2))
-        self.screen.blit(win_text, win_rect)
-
-    def check_win(self):
-        """Check if the puzzle is complete"""
-        # Check if all pieces have been placed
-        if not self.available_pieces:
-            # Check if all grid spaces are filled
-            for row in range(len(self.grid)):
-                for col in range(len(self.grid[0])):
-                    cell = self.grid[row][col]
-                    # Only check cells that should be filled (not None)
-                    if cell is not None and cell == 0:
-                        return False
-            return True
-        return False
-
-    def cycle_piece_forward(self):
-        """Scroll pieces to the right"""
-        if len(self.available_pieces) > 1:
-            total_width = sum((piece.width + 1) * CELL_SIZE for piece in self.available_pieces) - CELL_SIZE
-            max_scroll = max(0, total_width - WINDOW_WIDTH + 2 * PADDING)
-            
-            if self.target_scroll < max_scroll:
-                self.target_scroll = min(self.target_scroll + CELL_SIZE * 2, max_scroll)
-                self.max_scroll = max_scroll
-
-    def cycle_piece_backward(self):
-        """Scroll pieces to the left"""
-        if len(self.available_pieces) > 1:
-            if self.target_scroll > 0:
-                self.target_scroll = max(self.target_scroll - CELL_SIZE * 2, 0)
-
-    def update_scroll(self):
-        """Update scroll position with smooth transition"""
-        if self.scroll_offset < self.target_scroll:
-            self.scroll_offset = min(self.scroll_offset + self.scroll_speed, self.target_scroll)
-        elif self.scroll_offset > self.target_scroll:
-            self.scroll_offset = max(self.scroll_offset - self.scroll_speed, self.target_scroll)
+        self.screen.blit(text, rect)
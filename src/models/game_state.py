@@ -0,0 +1,252 @@
+from ..utils.constants import HISTORY_LIMIT, LEGAL_MOVES_CACHE, SNAP_DISTANCE
+from .bitboard import BitBoard
+from .history import History, Snapshot, color_cells
+from .legal_moves import LegalMoves
+from .piece import Piece
+from .puzzle import get_puzzle
+from .solver import completion_counter
+from .strip import StripLayout
+
+
+class GameState:
+    """Everything about a game except drawing it; never imports pygame"""
+
+    def __init__(self, puzzle=None):
+        # Board shape, piece set and window geometry (the stock puzzle by default)
+        self.puzzle = puzzle if puzzle is not None else get_puzzle()
+        self.layout = self.puzzle.layout
+
+        self.dragging = False
+        self.selected_piece = None
+        self.drag_pos = None
+        self.has_won = False
+
+        # Bumped whenever grid cells change, to invalidate the cached board
+        self.grid_version = 0
+
+        # Initial pieces list (store for reset)
+        self.initial_pieces = self.puzzle.create_pieces()
+
+        # Snapshots for undo/redo (see models/history.py)
+        self.history = History(HISTORY_LIMIT)
+
+        # Selection strip offsets, kept in step with available_pieces
+        self.strip = StripLayout(self.layout.cell_size, self.layout.padding)
+
+        # Where every piece orientation fits, updated as cells fill and empty
+        self.legal = LegalMoves(self.puzzle, LEGAL_MOVES_CACHE)
+
+        # Reset the board to initial state
+        self.reset_board()
+
+        # Add scroll variables
+        self.scroll_offset = 0
+        self.target_scroll = 0
+        self.scroll_speed = 15  # Pixels per frame
+        self.max_scroll = 0
+
+    def reset_board(self):
+        """Reset the board to its initial state"""
+        # Reset grid (None marks cells cut out of the board)
+        self.grid = self.puzzle.new_grid()
+        # Bitboard mirror of the grid used for validity and win checks
+        self.bits = BitBoard.from_grid(self.grid)
+        self.legal.update(self.bits.occupied)
+        self.grid_version += 1
+        # Reset available pieces (flyweights sharing the precomputed tables)
+        self.pieces = [Piece(kind=piece.kind) for piece in self.initial_pieces]
+        self.available_pieces = list(self.pieces)
+        self.strip.rebuild(self.available_pieces)
+        self._slots = {piece: 1 << slot for slot, piece in enumerate(self.pieces)}
+        # Colour layer and available-piece mask mirrored for snapshots
+        self.colors = None
+        self.remaining = (1 << len(self.pieces)) - 1
+        self.dragging = False
+        self.selected_piece = None
+        self.has_won = False
+        self.history.push(self.snapshot())
+
+    def new_game(self):
+        """Start over with an empty history, as a freshly made GameState would"""
+        self.history.clear()
+        self.reset_board()
+        self.scroll_offset = 0
+        self.target_scroll = 0
+
+    def to_grid(self, x, y):
+        """Convert pixel coordinates to (row, col) grid coordinates"""
+        return self.layout.to_grid(x, y)
+
+    def can_place(self, piece, row, col):
+        """Check if a piece fits with its top-left cell at the given grid cell"""
+        return self.legal.fits(piece.kind, piece.orientation, row, col)
+
+    def place(self, piece, row, col):
+        """Fill the grid cells under a piece anchored at the given grid cell"""
+        for r, c in piece.cells:
+            self.grid[row + r][col + c] = piece.color
+        mask = self.bits.placement_mask(piece, row, col)
+        self.bits.place(mask)
+        self.legal.update(self.bits.occupied)
+        self.colors = (mask, piece.color, self.colors)
+        self.grid_version += 1
+
+    def play(self, piece, row, col):
+        """Make a move: place an available piece, take it out of play and record it"""
+        self.place(piece, row, col)
+        index = self.available_pieces.index(piece)
+        del self.available_pieces[index]
+        self.strip.remove(index)
+        self.remaining &= ~self._slots[piece]
+        self.selected_piece = None
+        if self.check_win():
+            self.has_won = True
+        self.history.push(self.snapshot())
+
+    def rotate_piece(self, piece):
+        """Rotate a piece, moving the pieces after it in the strip if its width changed"""
+        piece.rotate()
+        if piece in self.available_pieces:
+            self.strip.resize(self.available_pieces.index(piece), piece)
+
+    def snapshot(self):
+        """Get the current board and piece supply as an immutable Snapshot"""
+        return Snapshot(self.bits.occupied, self.colors, self.remaining)
+
+    def restore(self, snapshot):
+        """Put the board and piece supply back to a snapshot"""
+        self.grid = self.puzzle.new_grid()
+        width = self.bits.width
+        for mask, color in color_cells(snapshot.colors):
+            while mask:
+                bit = (mask & -mask).bit_length() - 1
+                self.grid[bit // width][bit % width] = color
+                mask &= mask - 1
+        self.bits = BitBoard(
+            self.bits.playable, snapshot.occupied, width, self.bits.height
+        )
+        self.legal.update(snapshot.occupied)
+        self.colors = snapshot.colors
+        self.remaining = snapshot.remaining
+        self.available_pieces = [
+            piece
+            for slot, piece in enumerate(self.pieces)
+            if snapshot.remaining >> slot & 1
+        ]
+        self.strip.rebuild(self.available_pieces)
+        self.grid_version += 1
+        self.dragging = False
+        self.selected_piece = None
+        self.has_won = self.check_win()
+
+    def undo(self):
+        """Go back one move; returns False if there is nothing to undo"""
+        snapshot = self.history.undo()
+        if snapshot is None:
+            return False
+        self.restore(snapshot)
+        return True
+
+    def redo(self):
+        """Replay the next undone move; returns False if there is none"""
+        snapshot = self.history.redo()
+        if snapshot is None:
+            return False
+        self.restore(snapshot)
+        return True
+
+    def jump_to(self, move):
+        """Go straight to the state after an absolute move number in the history"""
+        self.restore(self.history.jump(move))
+
+    def is_valid_position(self, piece, start_x, start_y):
+        """Check if a piece can be placed at the given position"""
+        return self.can_place(piece, *self.to_grid(start_x, start_y))
+
+    def snap_position(self, piece, start_x, start_y):
+        """Get the legal grid cell nearest a piece's top-left pixel position, or None"""
+        layout = self.layout
+        row = (start_y - layout.title_height) / layout.cell_size
+        col = (start_x - layout.padding) / layout.cell_size
+        return self.legal.nearest(
+            piece.kind, piece.orientation, row, col, SNAP_DISTANCE
+        )
+
+    def has_moves(self, piece):
+        """Check if a piece fits anywhere on the board in any orientation"""
+        return self.legal.has_moves(piece.kind)
+
+    def place_piece(self, piece, x, y):
+        """Place a piece on the board at the given position"""
+        self.place(piece, *self.to_grid(x, y))
+
+    def get_piece_at_position(self, x, y):
+        """Get the piece at the given selection area position"""
+        layout = self.layout
+        if y < layout.strip_top:  # Check if click is above selection area
+            return None
+
+        # Strip coordinates: undo the scroll offset
+        index = self.strip.piece_at(x + self.scroll_offset, y - layout.strip_piece_top)
+        return None if index is None else self.available_pieces[index]
+
+    def strip_width(self):
+        """Get the width of all available pieces laid out in the selection area"""
+        return self.strip.width()
+
+    def scroll_limit(self):
+        """Get the furthest the selection area can scroll"""
+        return max(
+            0, self.strip_width() - self.layout.window_width + 2 * self.layout.padding
+        )
+
+    def check_win(self):
+        """Check if the puzzle is complete"""
+        # All pieces placed and every playable cell filled
+        return not self.available_pieces and self.bits.is_full()
+
+    def remaining_solutions(self):
+        """Count the ways to finish the puzzle from the current state"""
+        counter = completion_counter(
+            self.bits.playable,
+            self.bits.width,
+            self.bits.height,
+            tuple(sorted(self.puzzle.kinds)),
+        )
+        return counter.count(
+            self.bits.occupied, [piece.kind for piece in self.available_pieces]
+        )
+
+    def is_solvable(self):
+        """Check if the puzzle can still be finished from the current state"""
+        return self.remaining_solutions() > 0
+
+    def cycle_piece_forward(self):
+        """Scroll pieces to the right"""
+        if len(self.available_pieces) > 1:
+            max_scroll = self.scroll_limit()
+
+            if self.target_scroll < max_scroll:
+                self.target_scroll = min(
+                    self.target_scroll + self.layout.cell_size * 2, max_scroll
+                )
+                self.max_scroll = max_scroll
+
+    def cycle_piece_backward(self):
+        """Scroll pieces to the left"""
+        if len(self.available_pieces) > 1:
+            if self.target_scroll > 0:
+                self.target_scroll = max(
+                    self.target_scroll - self.layout.cell_size * 2, 0
+                )
+
+    def update_scroll(self):
+        """Update scroll position with smooth transition"""
+        if self.scroll_offset < self.target_scroll:
+            self.scroll_offset = min(
+                self.scroll_offset + self.scroll_speed, self.target_scroll
+            )
+        elif self.scroll_offset > self.target_scroll:
+            self.scroll_offset = max(
+                self.scroll_offset - self.scroll_speed, self.target_scroll
+            )
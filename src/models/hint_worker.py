@@ -0,0 +1,116 @@
+"""Solve the current board in a background process for hints
+
+The game submits the board after every change and polls for results once
+per frame, so a long solve never holds up drawing. Each job has an id; the
+newest id is shared with the worker, which skips queued jobs that are
+already stale and abandons a running search as soon as a newer job
+arrives.
+"""
+
+import multiprocessing
+import queue
+import signal
+
+from .bitboard import cell_bit
+from .piece import Piece
+from .puzzle import Puzzle
+from .solver import Solver
+
+
+def _solve(puzzle, occupied, kind_indices, stop):
+    """Find one solution for the board and pick the move that fills its first empty cell"""
+    grid = puzzle.new_grid()
+    for row in range(puzzle.height):
+        for col in range(puzzle.width):
+            if occupied & cell_bit(row, col, puzzle.width):
+                grid[row][col] = 1
+    pieces = [Piece(kind=puzzle.kinds[index]) for index in kind_indices]
+    solution = Solver(grid, pieces).solve(stop)
+    if solution is None:
+        return False, None
+    if not solution:
+        return True, None
+    first = min(solution, key=lambda p: p.mask & -p.mask)
+    return True, (first.piece, first.orientation, first.row, first.col)
+
+
+def _worker(puzzle_data, jobs, results, latest):
+    """Worker process loop: solve the newest job, drop the rest"""
+    # A forked worker inherits SDL's signal handlers, which would swallow
+    # terminate(); Ctrl+C is left to the game, which closes the worker
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    puzzle = Puzzle.from_dict(puzzle_data)
+    while True:
+        job = jobs.get()
+        # Skip ahead to the most recent job in the queue
+        while job is not None:
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                break
+        if job is None:
+            return
+        job_id, occupied, kind_indices = job
+        if job_id != latest.value:
+            continue
+        stop = lambda: latest.value != job_id
+        solvable, hint = _solve(puzzle, occupied, kind_indices, stop)
+        if not stop():
+            results.put((job_id, solvable, hint))
+
+
+class HintWorker:
+    """Background solver for hints and the "still solvable?" indicator"""
+
+    def __init__(self, puzzle):
+        self.puzzle = puzzle
+        self._kind_index = {kind: index for index, kind in enumerate(puzzle.kinds)}
+        context = multiprocessing.get_context()
+        self._jobs = context.Queue()
+        self._results = context.Queue()
+        # Id of the newest job, read by the worker to notice stale work
+        self._latest = context.RawValue("q", 0)
+        self._process = context.Process(
+            target=_worker,
+            args=(puzzle.to_dict(), self._jobs, self._results, self._latest),
+            daemon=True,
+        )
+        self._process.start()
+        self.job = 0
+        self.pending = False
+
+    def submit(self, state):
+        """Queue a solve of a game state, making every earlier job stale"""
+        self.job += 1
+        self._latest.value = self.job
+        kind_indices = [
+            self._kind_index[piece.kind] for piece in state.available_pieces
+        ]
+        self._jobs.put((self.job, state.bits.occupied, kind_indices))
+        self.pending = True
+
+    def poll(self):
+        """Get (solvable, hint) for the newest job if it has finished, else None
+
+        hint is None or one move of a solution as (index in
+        available_pieces, orientation, row, col).
+        """
+        result = None
+        while True:
+            try:
+                job, solvable, hint = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if job == self.job:
+                result = (solvable, hint)
+                self.pending = False
+        return result
+
+    def close(self):
+        """Stop the worker process"""
+        self._latest.value = -1
+        self._jobs.put(None)
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.terminate()
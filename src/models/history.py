@@ -0,0 +1,97 @@
+"""Immutable game-state snapshots and an undo/redo timeline
+
+A Snapshot is three immutable values: the occupancy mask, the colour
+layer and the mask of pieces still available (bit i is the i-th piece of
+the puzzle's set). The colour layer is a linked chain of
+(mask, colour, previous layer) tuples, so the snapshot after a move shares
+everything with the one before it and taking one costs O(1).
+
+History keeps snapshots in move order with a cursor. undo, redo and push
+are O(1). Pushing after an undo drops the redo branch. The oldest
+snapshots are dropped once there are more than maxlen.
+"""
+
+from collections import namedtuple
+
+Snapshot = namedtuple("Snapshot", "occupied colors remaining")
+
+
+def color_cells(colors):
+    """Walk a colour layer, newest piece first, as (mask, colour) pairs"""
+    while colors is not None:
+        mask, color, colors = colors
+        yield mask, color
+
+
+class History:
+    """Undo/redo timeline of snapshots with a memory cap"""
+
+    def __init__(self, maxlen=1000):
+        self.maxlen = maxlen
+        self.snapshots = []
+        # Moves dropped off the front, so move numbers stay absolute
+        self.base = 0
+        self.position = -1
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    @property
+    def current(self):
+        """Get the snapshot at the cursor"""
+        return self.snapshots[self.position]
+
+    @property
+    def move(self):
+        """Get the absolute number of the current move"""
+        return self.base + self.position
+
+    def push(self, snapshot):
+        """Record a new state after the cursor, discarding any redo branch"""
+        position = self.position + 1
+        if position < len(self.snapshots):
+            del self.snapshots[position:]
+        self.snapshots.append(snapshot)
+        self.position = position
+        if len(self.snapshots) > self.maxlen:
+            # Drop a quarter at a time so trimming stays O(1) amortized
+            drop = len(self.snapshots) - self.maxlen + self.maxlen // 4
+            del self.snapshots[:drop]
+            self.base += drop
+            self.position -= drop
+
+    def can_undo(self):
+        return self.position > 0
+
+    def can_redo(self):
+        return self.position < len(self.snapshots) - 1
+
+    def undo(self):
+        """Step back one move and return that snapshot, or None at the start"""
+        if not self.can_undo():
+            return None
+        self.position -= 1
+        return self.snapshots[self.position]
+
+    def redo(self):
+        """Step forward one move and return that snapshot, or None at the end"""
+        if not self.can_redo():
+            return None
+        self.position += 1
+        return self.snapshots[self.position]
+
+    def jump(self, move):
+        """Move the cursor to an absolute move number and return that snapshot"""
+        position = move - self.base
+        if not 0 <= position < len(self.snapshots):
+            raise IndexError(
+                f"move {move} is not in the history "
+                f"({self.base} to {self.base + len(self.snapshots) - 1})"
+            )
+        self.position = position
+        return self.snapshots[position]
+
+    def clear(self):
+        self.snapshots.clear()
+        self.base = 0
+        self.position = -1
@@ -0,0 +1,62 @@
+from ..utils.constants import (
+    BOTTOM_PADDING,
+    CELL_SIZE,
+    MAX_BOARD_PIXEL_HEIGHT,
+    MAX_BOARD_PIXEL_WIDTH,
+    PADDING,
+    SELECTION_HEIGHT,
+    TITLE_HEIGHT,
+)
+
+
+class Layout:
+    """Pixel geometry of the window for a board of the given size
+
+    Cells keep CELL_SIZE until the board would outgrow the maximum board
+    size, then shrink to fit; the window is sized around the board and the
+    selection area is tall enough for pieces of piece_rows rows.
+    """
+
+    def __init__(self, board_width, board_height, piece_rows=2):
+        self.board_width = board_width
+        self.board_height = board_height
+        self.cell_size = min(
+            CELL_SIZE,
+            MAX_BOARD_PIXEL_WIDTH // board_width,
+            MAX_BOARD_PIXEL_HEIGHT // board_height,
+        )
+        self.padding = PADDING
+        self.title_height = TITLE_HEIGHT
+        self.board_pixel_width = board_width * self.cell_size
+        self.board_pixel_height = board_height * self.cell_size
+
+        # Same meaning as WINDOW_WIDTH / WINDOW_HEIGHT for the stock board
+        self.window_width = self.board_pixel_width + 2 * PADDING
+        self.window_height = self.board_pixel_height + BOTTOM_PADDING
+        self.selection_height = max(
+            SELECTION_HEIGHT * self.cell_size // CELL_SIZE,
+            piece_rows * self.cell_size + 30,
+        )
+
+        # Selection strip position and the top of the pieces drawn in it
+        self.strip_top = TITLE_HEIGHT + self.window_height
+        self.strip_piece_top = self.strip_top + 20
+        self.screen_size = (
+            self.window_width,
+            self.window_height + self.selection_height + TITLE_HEIGHT,
+        )
+
+    def to_grid(self, x, y):
+        """Convert pixel coordinates to (row, col) grid coordinates"""
+        return (y - self.title_height) // self.cell_size, (
+            x - self.padding
+        ) // self.cell_size
+
+    def cell_rect(self, row, col):
+        """Get the (x, y, w, h) pixel rectangle of a board cell"""
+        return (
+            col * self.cell_size + self.padding,
+            row * self.cell_size + self.title_height,
+            self.cell_size,
+            self.cell_size,
+        )
@@ -0,0 +1,156 @@
+"""Legal anchors of every piece orientation, kept up to date move by move
+
+LegalMoves numbers the anchors of each kind and orientation of a puzzle's
+piece set (see piece.anchors) and keeps the ones that currently fit as a
+bitmask over those numbers. For every board cell it stores, per
+orientation, the mask of anchors covering that cell, so a move only looks
+at the cells it changed: a filled cell clears its covering anchors with
+one AND per orientation, and a freed cell (undo or reset) brings back the
+covering anchors that no longer overlap anything. Checking a position is
+a dict lookup and a bit test. The masks of recently seen boards are kept
+in an LRU table shared by every game of a board, so undo and redo are a
+copy instead of a recount.
+"""
+
+import math
+from functools import lru_cache
+
+from .piece import KINDS, anchors
+from .solver import TranspositionTable
+
+
+@lru_cache(maxsize=16)
+def _tables(kinds, playable, width, height):
+    """Anchor numbering and per-cell cover masks, shared by every game of a board"""
+    slots = {}
+    positions = []
+    masks = []
+    cover = [[] for _ in range(width * height)]
+    for kind in kinds:
+        kind_slots = slots[kind] = []
+        for orientation in range(len(KINDS[kind].orientations)):
+            slot = len(masks)
+            kind_slots.append(slot)
+            found = anchors(kind, orientation, playable, width, height)
+            positions.append(
+                {(anchor.row, anchor.col): index for index, anchor in enumerate(found)}
+            )
+            masks.append([anchor.mask for anchor in found])
+            covering = {}
+            for index, anchor in enumerate(found):
+                for bit in anchor.bits:
+                    covering[bit] = covering.get(bit, 0) | 1 << index
+            for bit, numbers in covering.items():
+                cover[bit].append((slot, numbers))
+    return slots, positions, masks, cover
+
+
+@lru_cache(maxsize=16)
+def _seen(key, maxsize):
+    """Legal masks by occupancy, shared by every game of a board"""
+    return TranspositionTable(maxsize)
+
+
+class LegalMoves:
+    """Legal anchors per kind and orientation on one board"""
+
+    def __init__(self, puzzle, maxsize=256):
+        self.occupied = 0
+        key = (
+            tuple(sorted(set(puzzle.kinds))),
+            puzzle.playable,
+            puzzle.width,
+            puzzle.height,
+        )
+        # Legal masks of recently seen boards, keyed on occupancy; they only
+        # depend on the board, so every game of it shares the table
+        self.seen = _seen(key, maxsize)
+        # Slot numbers of each kind's orientations (one slot per kind and
+        # orientation); per slot the anchor number by (row, col) and board
+        # mask by anchor number; cover[bit] lists (slot, anchors over the cell)
+        self.slots, self.positions, self.masks, self.cover = _tables(*key)
+        # Legal anchor bits per slot
+        self.legal = [(1 << len(masks)) - 1 for masks in self.masks]
+
+    def update(self, occupied):
+        """Bring the legal anchors in line with a new occupancy mask"""
+        if occupied == self.occupied:
+            return
+        cached = self.seen.get(occupied)
+        if cached is not None:
+            self.legal[:] = cached
+            self.occupied = occupied
+            return
+        self._update(occupied)
+        self.seen.put(occupied, tuple(self.legal))
+
+    def _update(self, occupied):
+        filled = occupied & ~self.occupied
+        freed = self.occupied & ~occupied
+        self.occupied = occupied
+        legal = self.legal
+        cover = self.cover
+        while filled:
+            bit = (filled & -filled).bit_length() - 1
+            filled &= filled - 1
+            for slot, numbers in cover[bit]:
+                legal[slot] &= ~numbers
+        if not freed:
+            return
+        if not occupied:
+            # Back to an empty board: everything fits again
+            for slot, masks in enumerate(self.masks):
+                legal[slot] = (1 << len(masks)) - 1
+            return
+        # Anchors over the freed cells, per slot, so each is checked once
+        touched = {}
+        while freed:
+            bit = (freed & -freed).bit_length() - 1
+            freed &= freed - 1
+            for slot, numbers in cover[bit]:
+                touched[slot] = touched.get(slot, 0) | numbers
+        for slot, candidates in touched.items():
+            # Bring back the ones clear of every filled cell
+            candidates &= ~legal[slot]
+            masks = self.masks[slot]
+            while candidates:
+                number = (candidates & -candidates).bit_length() - 1
+                candidates &= candidates - 1
+                if not masks[number] & occupied:
+                    legal[slot] |= 1 << number
+
+    def fits(self, kind, orientation, row, col):
+        """Check if an orientation can go at an anchor"""
+        slot = self.slots[kind][orientation]
+        number = self.positions[slot].get((row, col))
+        return number is not None and self.legal[slot] >> number & 1 == 1
+
+    def anchors(self, kind, orientation):
+        """Get the (row, col) anchors where an orientation fits"""
+        slot = self.slots[kind][orientation]
+        legal = self.legal[slot]
+        return [
+            position
+            for position, number in self.positions[slot].items()
+            if legal >> number & 1
+        ]
+
+    def has_moves(self, kind):
+        """Check if a kind fits anywhere in any orientation"""
+        legal = self.legal
+        return any(legal[slot] for slot in self.slots[kind])
+
+    def nearest(self, kind, orientation, row, col, limit=1.0):
+        """Get the legal anchor closest to a fractional grid position, or None
+
+        Only anchors within limit cells (straight-line distance) are considered.
+        """
+        best = None
+        best_distance = limit * limit
+        # Look up the anchors in the square around the position
+        for r in range(math.ceil(row - limit), math.floor(row + limit) + 1):
+            for c in range(math.ceil(col - limit), math.floor(col + limit) + 1):
+                distance = (r - row) ** 2 + (c - col) ** 2
+                if distance <= best_distance and self.fits(kind, orientation, r, c):
+                    best, best_distance = (r, c), distance
+        return best
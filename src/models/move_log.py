@@ -0,0 +1,238 @@
+"""Compact binary log of a play session, and headless replay
+
+A log is a header (magic, version, puzzle name) followed by one record
+per event::
+
+    opcode (1 byte) | ms since the previous event (LEB128 varint) | payload
+
+    SELECT  piece index                   1 byte
+    ROTATE  piece index                   1 byte
+    PLACE   piece index, row, col         3 bytes
+    RESET   -
+    UNDO    -
+    REDO    -
+
+Piece indices are positions in available_pieces at the time of the event,
+so most records take 3 to 5 bytes. Replaying the events in order through
+a GameState reproduces the session exactly.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+MAGIC = b"TPML"
+VERSION = 1
+
+SELECT, ROTATE, PLACE, RESET, UNDO, REDO = range(6)
+OPCODE_NAMES = ("select", "rotate", "place", "reset", "undo", "redo")
+PAYLOAD_SIZES = (1, 1, 3, 0, 0, 0)
+
+# One decoded record: opcode, ms since the previous event, payload bytes
+Event = namedtuple("Event", "op delay args")
+
+
+def header(puzzle_name):
+    """Get the bytes that start a log for a puzzle"""
+    name = puzzle_name.encode("utf-8")
+    return MAGIC + bytes((VERSION,)) + len(name).to_bytes(2, "little") + name
+
+
+def encode(op, delay, args=()):
+    """Encode one event record"""
+    out = bytearray((op,))
+    delay = max(0, int(delay))
+    while True:
+        byte = delay & 0x7F
+        delay >>= 7
+        if delay:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            break
+    out.extend(args)
+    return bytes(out)
+
+
+def decode(data):
+    """Split a log into its puzzle name and list of events"""
+    if data[:4] != MAGIC:
+        raise ValueError("not a move log")
+    if len(data) < 7:
+        raise ValueError(
+            f"truncated move log: {len(data)} bytes, shorter than its header"
+        )
+    if data[4] != VERSION:
+        raise ValueError(f"unsupported move log version {data[4]}")
+    end = 7 + int.from_bytes(data[5:7], "little")
+    if end > len(data):
+        raise ValueError(
+            f"truncated move log: the puzzle name needs {end} bytes, "
+            f"the log has {len(data)}"
+        )
+    puzzle_name = data[7:end].decode("utf-8")
+
+    events = []
+    pos = end
+    size = len(data)
+    try:
+        while pos < size:
+            op = data[pos]
+            if op >= len(PAYLOAD_SIZES):
+                raise ValueError(f"unknown move log opcode {op} at byte {pos}")
+            pos += 1
+            delay = shift = 0
+            while True:
+                byte = data[pos]
+                pos += 1
+                delay |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            payload = PAYLOAD_SIZES[op]
+            if pos + payload > size:
+                break
+            events.append(Event(op, delay, tuple(data[pos : pos + payload])))
+            pos += payload
+    except IndexError:
+        # A record cut short by a crash mid-write; keep everything before it
+        pass
+    return puzzle_name, events
+
+
+def read_log(path):
+    """Read and decode a log file"""
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+class NullRecorder:
+    """Recorder used when logging is off; every call is a no-op"""
+
+    enabled = False
+
+    def select(self, index):
+        pass
+
+    def rotate(self, index):
+        pass
+
+    def place(self, index, row, col):
+        pass
+
+    def reset(self):
+        pass
+
+    def undo(self):
+        pass
+
+    def redo(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_RECORDER = NullRecorder()
+
+
+class MoveRecorder:
+    """Append-only log writer that never blocks the caller on disk
+
+    Events are encoded into a memory buffer; a background thread swaps the
+    buffer out and appends it to the file every flush_interval seconds.
+    """
+
+    enabled = True
+
+    def __init__(self, path, puzzle_name, flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._file = open(path, "wb")
+        self._buffer = bytearray(header(puzzle_name))
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._last = time.perf_counter()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def _record(self, op, args=()):
+        now = time.perf_counter()
+        record = encode(op, (now - self._last) * 1000, args)
+        self._last = now
+        with self._lock:
+            self._buffer += record
+
+    def select(self, index):
+        self._record(SELECT, (index,))
+
+    def rotate(self, index):
+        self._record(ROTATE, (index,))
+
+    def place(self, index, row, col):
+        self._record(PLACE, (index, row, col))
+
+    def reset(self):
+        self._record(RESET)
+
+    def undo(self):
+        self._record(UNDO)
+
+    def redo(self):
+        self._record(REDO)
+
+    def _flush(self):
+        with self._lock:
+            data, self._buffer = self._buffer, bytearray()
+        if data:
+            self._file.write(data)
+            self._file.flush()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self._flush()
+
+    def close(self):
+        """Stop the writer thread and write out everything left"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+        self._flush()
+        self._file.close()
+
+
+def apply(state, event):
+    """Apply one event to a GameState"""
+    op, _, args = event
+    if op == SELECT:
+        state.selected_piece = state.available_pieces[args[0]]
+    elif op == ROTATE:
+        state.rotate_piece(state.available_pieces[args[0]])
+    elif op == PLACE:
+        index, row, col = args
+        piece = state.available_pieces[index]
+        if not state.can_place(piece, row, col):
+            raise ValueError(
+                f"logged placement of piece {index} at ({row}, {col}) " f"does not fit"
+            )
+        state.play(piece, row, col)
+    elif op == RESET:
+        state.reset_board()
+        state.scroll_offset = 0
+        state.target_scroll = 0
+    elif op == UNDO:
+        state.undo()
+    elif op == REDO:
+        state.redo()
+    else:
+        raise ValueError(f"unknown move log opcode {op}")
+
+
+def replay(state, events):
+    """Run a session's events through a GameState, starting from a fresh game"""
+    # Undo must not reach back past the start of this session
+    state.new_game()
+    for event in events:
+        apply(state, event)
+    return state
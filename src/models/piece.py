@@ -1,54 +1,139 @@
+from collections import namedtuple
+from functools import lru_cache
+
 from ..utils.constants import PIECE_COLORS
 
+# One rotation of a piece: its shape, size and filled (row, col) offsets
+Orientation = namedtuple("Orientation", "shape width height cells")
+
+# A piece type shared by every Piece of that shape and colour
+PieceKind = namedtuple("PieceKind", "name color orientations")
+
+# A legal top-left cell for one orientation, the cells it covers there
+# as a mask and the indices of those cells' bits
+Anchor = namedtuple("Anchor", "row col mask bits")
+
+# Shapes of the stock piece set, in selection-strip order
+STOCK_SHAPES = (
+    ('RED_S', ((1, 1, 0),
+               (0, 1, 1))),
+    ('GREEN_Z', ((0, 1, 1),
+                 (1, 1, 0))),
+    ('PURPLE_T', ((0, 1, 0),
+                  (1, 1, 1))),
+    ('ORANGE_L', ((0, 0, 1),
+                  (1, 1, 1))),
+    ('BLUE_L', ((1, 1, 1),
+                (0, 0, 1))),
+    ('YELLOW_SQUARE', ((1, 1),
+                       (1, 1))),
+    ('CYAN_LINE', ((1, 1, 1, 1),)),
+)
+
+# Every registered piece kind, indexed by kind id
+KINDS = []
+_kind_ids = {}
+
+
+def _normalize(shape):
+    """Convert a shape into a hashable tuple of 0/1 rows"""
+    return tuple(tuple(1 if cell else 0 for cell in row) for row in shape)
+
+
+def _orientations(shape, flip=False):
+    """Get the distinct clockwise rotations of a shape, in rotation order
+
+    With flip, the rotations of the mirror image follow the rotations of
+    the shape itself.
+    """
+    orientations = []
+    seen = set()
+    for start in ((shape, shape[::-1]) if flip else (shape,)):
+        shape = start
+        for _ in range(4):
+            if shape not in seen:
+                seen.add(shape)
+                cells = tuple((row, col) for row, line in enumerate(shape)
+                              for col, filled in enumerate(line) if filled)
+                orientations.append(Orientation(shape, len(shape[0]), len(shape), cells))
+            # Rotate 90 degrees clockwise
+            shape = tuple(zip(*shape[::-1]))
+    return tuple(orientations)
+
+
+def kind_for(shape, color, name=None, flip=False):
+    """Get the kind id for a shape and colour, registering it if new"""
+    key = (_normalize(shape), tuple(color) if color is not None else None, flip)
+    kind = _kind_ids.get(key)
+    if kind is None:
+        kind = len(KINDS)
+        KINDS.append(PieceKind(name, key[1], _orientations(key[0], flip)))
+        _kind_ids[key] = kind
+    return kind
+
+
+@lru_cache(maxsize=None)
+def anchors(kind, orientation, playable, width, height):
+    """Get every anchor where an orientation fits inside the playable mask
+
+    Worked out once per orientation and board; tools that go through many
+    one-off boards call anchors.cache_clear() when done with each.
+    """
+    shape = KINDS[kind].orientations[orientation]
+    result = []
+    for row in range(height - shape.height + 1):
+        for col in range(width - shape.width + 1):
+            bits = tuple((row + r) * width + col + c for r, c in shape.cells)
+            mask = sum(1 << bit for bit in bits)
+            if mask & playable == mask:
+                result.append(Anchor(row, col, mask, bits))
+    return tuple(result)
+
+
+# Register the stock set
+STOCK_KINDS = tuple(kind_for(shape, PIECE_COLORS[name], name)
+                    for name, shape in STOCK_SHAPES)
+
+
 class Piece:
-    def __init__(self, shape=None, color=None):
-        if shape is None:
-            # Default shape (red S piece)
-            self.shape = [
-                [1, 1, 0],  # Top row
-                [0, 1, 1]   # Bottom row
-            ]
-            self.color = PIECE_COLORS['RED_S']
-        else:
-            self.shape = shape
-            self.color = color
-            
-        self.width = len(self.shape[0])
-        self.height = len(self.shape)
-    
+    """A piece in play: a kind plus its current orientation"""
+    __slots__ = ('kind', 'orientation')
+
+    def __init__(self, shape=None, color=None, kind=None, orientation=0):
+        if kind is None:
+            if shape is None:
+                # Default shape (red S piece)
+                kind = STOCK_KINDS[0]
+            else:
+                kind = kind_for(shape, color)
+        self.kind = kind
+        self.orientation = orientation
+
+    @property
+    def shape(self):
+        return KINDS[self.kind].orientations[self.orientation].shape
+
+    @property
+    def width(self):
+        return KINDS[self.kind].orientations[self.orientation].width
+
+    @property
+    def height(self):
+        return KINDS[self.kind].orientations[self.orientation].height
+
+    @property
+    def cells(self):
+        return KINDS[self.kind].orientations[self.orientation].cells
+
+    @property
+    def color(self):
+        return KINDS[self.kind].color
+
     def rotate(self):
-        # Create a new rotated shape (90 degrees clockwise)
-        rotated = [[0 for _ in range(self.height)] for _ in range(self.width)]
-        for row in range(self.height):
-            for col in range(self.width):
-                rotated[col][self.height - 1 - row] = self.shape[row][col]
-        
-        # Update shape and dimensions
-        self.shape = rotated
-        self.width, self.height = self.height, self.width
+        """Rotate 90 degrees clockwise (then flip, for pieces that may flip)"""
+        self.orientation = (self.orientation + 1) % len(KINDS[self.kind].orientations)
 
     @staticmethod
     def create_all_pieces():
         """Create all the initial game pieces"""
-        return [
-            Piece(shape=[[1, 1, 0],    # Red S piece
-                        [0, 1, 1]],
-                 color=PIECE_COLORS['RED_S']),
-            Piece(shape=[[0, 1, 1],    # Green Z piece
-                        [1, 1, 0]],
-                 color=PIECE_COLORS['GREEN_Z']),
-            Piece(shape=[[0, 1, 0],    # Purple T piece
-                        [1, 1, 1]],
-                 color=PIECE_COLORS['PURPLE_T']),
-            Piece(shape=[[0, 0, 1],    # Orange L piece
-                        [1, 1, 1]],
-                 color=PIECE_COLORS['ORANGE_L']),
-            Piece(shape=[[1, 1, 1],    # Dark blue reversed L piece
-                        [0, 0, 1]],
-                 color=PIECE_COLORS['BLUE_L']),
-            Piece(shape=[[1, 1],       # Yellow square piece
-                        [1, 1]],
-                 color=PIECE_COLORS['YELLOW_SQUARE']),
-            Piece(shape=[[1, 1, 1, 1]], # Light blue line piece
-                 color=PIECE_COLORS['CYAN_LINE'])
-        ]
+        return [Piece(kind=kind) for kind in STOCK_KINDS]
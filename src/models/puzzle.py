@@ -0,0 +1,153 @@
+"""Puzzle definitions: board shape plus piece set, loadable from JSON
+
+A puzzle file looks like::
+
+    {
+        "name": "pentomino_6x10",
+        "width": 10,
+        "height": 6,
+        "missing": [[0, 0]],
+        "flip": true,
+        "pieces": [
+            {"name": "F", "color": [255, 50, 50], "shape": [".##", "##.", ".#."]}
+        ]
+    }
+
+Shapes are rows of '#' (filled) and '.' (empty) or nested lists of 0/1.
+"missing" lists the (row, col) cells cut out of the board, and "flip" lets
+pieces be mirrored as well as rotated.
+"""
+
+import json
+import os
+
+from ..utils.constants import BOARD_HEIGHT, BOARD_WIDTH, MISSING_CELLS, PIECE_COLORS
+from .bitboard import cell_bit
+from .layout import Layout
+from .piece import KINDS, STOCK_SHAPES, Piece, anchors, kind_for
+
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "puzzles")
+
+
+def _parse_shape(rows):
+    """Convert '#'/'.' strings or 0/1 lists into 0/1 rows"""
+    return tuple(
+        tuple(1 if cell in ("#", 1, True) else 0 for cell in row) for row in rows
+    )
+
+
+class Puzzle:
+    def __init__(self, name, width, height, pieces, missing=(), flip=False):
+        """Define a puzzle from its board size, cut-out cells and (name, shape, color) pieces"""
+        self.name = name
+        self.width = width
+        self.height = height
+        self.missing = tuple(tuple(cell) for cell in missing)
+        self.flip = flip
+        self.kinds = tuple(
+            kind_for(_parse_shape(shape), color, piece_name, flip)
+            for piece_name, shape, color in pieces
+        )
+
+        full = (1 << (width * height)) - 1
+        self.playable = full & ~sum(
+            cell_bit(row, col, width) for row, col in self.missing
+        )
+        piece_rows = max(KINDS[kind].orientations[0].height for kind in self.kinds)
+        self.layout = Layout(width, height, piece_rows)
+
+        cells = bin(self.playable).count("1")
+        piece_cells = sum(len(KINDS[kind].orientations[0].cells) for kind in self.kinds)
+        if cells != piece_cells:
+            raise ValueError(
+                f"puzzle {name!r} has {cells} cells but its pieces "
+                f"cover {piece_cells}"
+            )
+
+    def new_grid(self):
+        """Get an empty grid with None in the missing cells"""
+        grid = [[0] * self.width for _ in range(self.height)]
+        for row, col in self.missing:
+            grid[row][col] = None
+        return grid
+
+    def create_pieces(self):
+        """Create one Piece per entry of the piece set"""
+        return [Piece(kind=kind) for kind in self.kinds]
+
+    def anchors(self, kind, orientation):
+        """Get every anchor of a piece orientation on this board"""
+        return anchors(kind, orientation, self.playable, self.width, self.height)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a puzzle from parsed JSON"""
+        pieces = [
+            (piece.get("name"), piece["shape"], tuple(piece["color"]))
+            for piece in data["pieces"]
+        ]
+        return cls(
+            data.get("name", "custom"),
+            data["width"],
+            data["height"],
+            pieces,
+            data.get("missing", ()),
+            data.get("flip", False),
+        )
+
+    def to_dict(self):
+        """Get the puzzle as JSON-ready data that from_dict turns back into it"""
+        return {
+            "name": self.name,
+            "width": self.width,
+            "height": self.height,
+            "missing": [list(cell) for cell in self.missing],
+            "flip": self.flip,
+            "pieces": [
+                {
+                    "name": KINDS[kind].name,
+                    "color": list(KINDS[kind].color),
+                    "shape": [
+                        "".join("#" if cell else "." for cell in row)
+                        for row in KINDS[kind].orientations[0].shape
+                    ],
+                }
+                for kind in self.kinds
+            ],
+        }
+
+    @classmethod
+    def load(cls, path):
+        """Load a puzzle from a JSON file"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+# The stock board and piece set
+CLASSIC = Puzzle(
+    "classic",
+    BOARD_WIDTH,
+    BOARD_HEIGHT,
+    [(name, shape, PIECE_COLORS[name]) for name, shape in STOCK_SHAPES],
+    MISSING_CELLS,
+)
+
+_builtin = {"classic": CLASSIC}
+
+
+def builtin_puzzles():
+    """Get the names of the puzzles shipped with the game"""
+    names = {name[:-5] for name in os.listdir(PUZZLE_DIR) if name.endswith(".json")}
+    return sorted(names | {"classic"})
+
+
+def get_puzzle(name=None):
+    """Get a built-in puzzle by name, or load one from a JSON file path"""
+    if name is None:
+        return CLASSIC
+    puzzle = _builtin.get(name)
+    if puzzle is None:
+        path = os.path.join(PUZZLE_DIR, name + ".json")
+        puzzle = Puzzle.load(path if os.path.exists(path) else name)
+        _builtin[name] = puzzle
+    return puzzle
@@ -0,0 +1,284 @@
+"""Every solution of a puzzle in a memory-mapped file, with a lookup index
+
+python -m src.models.solution_db --puzzle classic --out classic.tpsd
+enumerates the solutions once (one search per symmetry class, see
+symmetry.py) and writes them out. SolutionDB maps the file and answers
+"which solutions extend this board?" without searching.
+
+Placements are numbered in a fixed order: the puzzle's kinds in order of
+first appearance, then orientations, then anchors (see piece.anchors).
+The file is::
+
+    header    magic "TPSD" | version | pieces | 0 | solutions | placements | JSON length
+    puzzle    the puzzle's to_dict() as JSON, padded to 8 bytes
+    records   one per solution: the placement number of every piece (u16 LE)
+    index     one bitset of solution ids per placement, ceil(solutions / 8) bytes each
+
+A board is the set of pieces on it, each told apart by colour and cells
+(which is what GameState's colour layer keeps). Listing every subset of
+every solution by occupancy would take 2**pieces keys per solution, so the
+index is keyed by single placements instead: the solutions extending a
+board are the AND of the bitsets of the pieces on it.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from .game_state import GameState
+from .history import color_cells
+from .piece import KINDS, anchors
+from .puzzle import Puzzle, get_puzzle
+from .solver import Placement
+from .symmetry import expand, to_placements, unique_solutions
+
+MAGIC = b"TPSD"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHIII")
+
+
+def _pad(size):
+    return -size % 8
+
+
+def placement_table(puzzle):
+    """Number every placement of the puzzle's kinds: [(kind, orientation, anchor)]"""
+    table = []
+    for kind in dict.fromkeys(puzzle.kinds):
+        for orientation in range(len(KINDS[kind].orientations)):
+            for anchor in anchors(
+                kind, orientation, puzzle.playable, puzzle.width, puzzle.height
+            ):
+                table.append((kind, orientation, anchor))
+    return table
+
+
+def build(puzzle):
+    """Enumerate a puzzle's solutions and get the database file contents"""
+    table = placement_table(puzzle)
+    if len(table) > 0xFFFF:
+        raise ValueError(
+            f"puzzle {puzzle.name!r} has too many placements for a database"
+        )
+    numbers = {
+        (kind, anchor.mask): number for number, (kind, _, anchor) in enumerate(table)
+    }
+
+    state = GameState(puzzle)
+    pieces = state.available_pieces
+    symmetry, classes = unique_solutions(state.grid, pieces)
+    records = []
+    for key in expand(symmetry, classes):
+        placements = to_placements(key, pieces, puzzle.width)
+        records.append([numbers[pieces[p.piece].kind, p.mask] for p in placements])
+    records.sort()
+
+    stride = (len(records) + 7) // 8
+    bitsets = [0] * len(table)
+    for solution, record in enumerate(records):
+        for number in record:
+            bitsets[number] |= 1 << solution
+
+    data = json.dumps(puzzle.to_dict(), separators=(",", ":")).encode("utf-8")
+    out = bytearray(
+        HEADER.pack(MAGIC, VERSION, len(pieces), 0, len(records), len(table), len(data))
+    )
+    out += data + bytes(_pad(HEADER.size + len(data)))
+    record_format = struct.Struct(f"<{len(pieces)}H")
+    for record in records:
+        out += record_format.pack(*record)
+    out += bytes(_pad(len(out)))
+    for bitset in bitsets:
+        out += bitset.to_bytes(stride, "little")
+    return bytes(out)
+
+
+def write(puzzle, path):
+    """Build a puzzle's database and write it, replacing the file atomically"""
+    data = build(puzzle)
+    partial = path + ".partial"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
+    return len(data)
+
+
+class SolutionDB:
+    """Read-only view of a solution database file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._map
+        magic, version, pieces, _, count, placements, json_length = HEADER.unpack_from(
+            data
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a solution database")
+        if version != VERSION:
+            raise ValueError(f"unsupported solution database version {version}")
+        start = HEADER.size
+        self.puzzle = Puzzle.from_dict(json.loads(data[start : start + json_length]))
+        self.count = count
+
+        self.table = placement_table(self.puzzle)
+        if len(self.table) != placements or len(self.puzzle.kinds) != pieces:
+            raise ValueError(f"{path} does not match its puzzle definition")
+        # Placement number by (colour, cells), how the board records its pieces
+        self.numbers = {
+            (KINDS[kind].color, anchor.mask): number
+            for number, (kind, _, anchor) in enumerate(self.table)
+        }
+
+        self._record = struct.Struct(f"<{pieces}H")
+        self._records = start + json_length + _pad(start + json_length)
+        index = self._records + count * self._record.size
+        self._index = index + _pad(index)
+        self._stride = (count + 7) // 8
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self.count
+
+    def matches(self, puzzle):
+        """Check that the database was built for a puzzle's board and pieces"""
+        return (
+            puzzle.kinds == self.puzzle.kinds
+            and puzzle.playable == self.puzzle.playable
+            and (puzzle.width, puzzle.height) == (self.puzzle.width, self.puzzle.height)
+        )
+
+    def record(self, solution):
+        """Get the placement numbers of a solution, one per piece"""
+        if not 0 <= solution < self.count:
+            raise IndexError(f"solution {solution} is not in the database")
+        return self._record.unpack_from(
+            self._map, self._records + solution * self._record.size
+        )
+
+    def solution(self, solution):
+        """Get a solution as Placements, in the puzzle's piece order"""
+        result = []
+        for piece, number in enumerate(self.record(solution)):
+            _, orientation, anchor = self.table[number]
+            result.append(
+                Placement(piece, orientation, anchor.row, anchor.col, anchor.mask)
+            )
+        return result
+
+    def bitset(self, number):
+        """Get the set of solutions that use a placement, as an int bitset"""
+        start = self._index + number * self._stride
+        return int.from_bytes(self._map[start : start + self._stride], "little")
+
+    def matching(self, placed):
+        """Get the bitset of solutions containing every (colour, cells) piece placed"""
+        result = (1 << self.count) - 1
+        for key in placed:
+            number = self.numbers.get(key)
+            if number is None:
+                return 0
+            result &= self.bitset(number)
+            if not result:
+                break
+        return result
+
+    def extending(self, placed):
+        """Get the ids of the solutions that extend a board"""
+        found = self.matching(placed)
+        ids = []
+        while found:
+            low = found & -found
+            ids.append(low.bit_length() - 1)
+            found ^= low
+        return ids
+
+    def hint(self, state):
+        """Get (solvable, hint) for a game state, in HintWorker.poll's format"""
+        placed = [(color, mask) for mask, color in color_cells(state.colors)]
+        found = self.matching(placed)
+        if not found:
+            return False, None
+        if not state.available_pieces:
+            return True, None
+        # Of the first matching solution's missing pieces, fill the first empty cell
+        used = {self.numbers[key] for key in placed}
+        solution = (found & -found).bit_length() - 1
+        number = min(
+            (number for number in self.record(solution) if number not in used),
+            key=lambda number: self.table[number][2].mask & -self.table[number][2].mask,
+        )
+        kind, orientation, anchor = self.table[number]
+        index = next(
+            index
+            for index, piece in enumerate(state.available_pieces)
+            if piece.kind == kind
+        )
+        return True, (index, orientation, anchor.row, anchor.col)
+
+
+class DatabaseHints:
+    """Drop-in for HintWorker that answers from a SolutionDB as soon as asked"""
+
+    pending = False
+
+    def __init__(self, database):
+        self.database = database
+        self._result = None
+
+    def submit(self, state):
+        self._result = self.database.hint(state)
+
+    def poll(self):
+        result, self._result = self._result, None
+        return result
+
+    def close(self):
+        self.database.close()
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Build or inspect a solution database")
+    parser.add_argument("--puzzle", help="puzzle name or JSON file (default: classic)")
+    parser.add_argument("--out", help="database file to write (default: PUZZLE.tpsd)")
+    parser.add_argument("--show", metavar="FILE", help="print a database's contents")
+    args = parser.parse_args()
+
+    if args.show:
+        database = SolutionDB(args.show)
+        print(
+            f"{database.puzzle.name}: {database.count} solutions, "
+            f"{len(database.table)} placements"
+        )
+        for solution in range(database.count):
+            print(
+                solution,
+                " ".join(
+                    f"{p.piece}:{p.orientation}@{p.row},{p.col}"
+                    for p in database.solution(solution)
+                ),
+            )
+        database.close()
+        return 0
+
+    puzzle = get_puzzle(args.puzzle)
+    path = args.out or f"{puzzle.name}.tpsd"
+    start = time.perf_counter()
+    size = write(puzzle, path)
+    elapsed = time.perf_counter() - start
+    database = SolutionDB(path)
+    print(f"{path}: {database.count} solutions, {size:,} bytes in {elapsed:.2f}s")
+    database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
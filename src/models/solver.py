@@ -0,0 +1,381 @@
+"""Headless exact-cover solver for the puzzle
+
+Each empty board cell and each available piece is a column. Each way of
+putting a piece (in one of its orientations) on empty cells is a row that
+covers the piece's column and the cells it fills. A solution picks rows
+that cover every column exactly once, which Algorithm X finds.
+
+Where Knuth's Dancing Links unlinks and relinks list nodes, the matrix is
+kept as bitsets over the row numbers: the rows of each column, and for each
+row every row that shares a column with it. Picking a row is then one AND
+on the set of live rows, and backtracking drops back to the previous set,
+so nothing has to be restored.
+"""
+
+import time
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from math import gcd
+
+from .bitboard import grid_masks, regions
+from .piece import KINDS, anchors
+
+# One piece put on the board: index into the piece list, orientation
+# index in the piece's kind, top-left cell and cell mask
+Placement = namedtuple("Placement", "piece orientation row col mask")
+
+# int.bit_count is new in Python 3.10
+_popcount = getattr(int, "bit_count", None) or (lambda value: bin(value).count("1"))
+
+
+@lru_cache(maxsize=64)
+def _matrix(width, height, playable, kinds, restrict):
+    """Build the matrix of an empty board, shared by every solver of it
+
+    restrict is None or a tuple of (piece index, frozenset of masks).
+    Returns the placements and, per column, the bitset of its rows; per
+    row, the bitset of its columns and of the rows it clashes with.
+    """
+    restrict = dict(restrict) if restrict else {}
+
+    # Columns are numbered by cell bit, so a placement's mask is its cell
+    # columns as it is; the piece columns follow the board
+    cells = width * height
+    column_rows = [0] * (cells + len(kinds))
+
+    # Every placement comes from the shared anchor tables
+    placements = []
+    row_columns = []
+    row_cells = []
+    for index, kind in enumerate(kinds):
+        allowed = restrict.get(index)
+        piece_column = 1 << (cells + index)
+        for orientation in range(len(KINDS[kind].orientations)):
+            for anchor in anchors(kind, orientation, playable, width, height):
+                if allowed is not None and anchor.mask not in allowed:
+                    continue
+                row = 1 << len(placements)
+                for bit in anchor.bits:
+                    column_rows[bit] |= row
+                column_rows[cells + index] |= row
+                row_columns.append(anchor.mask | piece_column)
+                row_cells.append(anchor.bits)
+                placements.append(
+                    Placement(index, orientation, anchor.row, anchor.col, anchor.mask)
+                )
+
+    clashes = []
+    for placement, bits in zip(placements, row_cells):
+        rows = column_rows[cells + placement.piece]
+        for bit in bits:
+            rows |= column_rows[bit]
+        clashes.append(rows)
+    return tuple(placements), tuple(column_rows), tuple(row_columns), tuple(clashes)
+
+
+class Solver:
+    def __init__(self, grid, pieces, restrict=None):
+        """Set up the exact-cover matrix for a grid and the pieces left to place
+
+        restrict optionally maps a piece index to the only masks it may use.
+        """
+        self.grid = grid
+        self.pieces = list(pieces)
+        height = len(grid)
+        width = len(grid[0])
+        playable, occupied = grid_masks(grid)
+        if restrict:
+            restrict = tuple(
+                sorted((index, frozenset(masks)) for index, masks in restrict.items())
+            )
+        # The matrix is never changed by a search, and filled cells only
+        # rule rows out, so every position of a board and piece set shares it
+        self.placements, self.column_rows, self.row_columns, self.clashes = _matrix(
+            width,
+            height,
+            playable,
+            tuple(piece.kind for piece in self.pieces),
+            restrict or None,
+        )
+
+        # Empty cells and pieces are the columns to cover; rows over a
+        # filled cell are out from the start
+        cells = width * height
+        self.columns = playable & ~occupied | ((1 << len(self.pieces)) - 1) << cells
+        live = (1 << len(self.placements)) - 1
+        filled = playable & occupied
+        while filled:
+            low = filled & -filled
+            filled ^= low
+            live &= ~self.column_rows[low.bit_length() - 1]
+        self.live = live
+        self._stop = None
+
+    def _search(self):
+        """Yield the rows of every exact cover
+
+        The yielded list is reused for the next solution, so copy it to keep it.
+        """
+        column_rows, row_columns, clashes = (
+            self.column_rows,
+            self.row_columns,
+            self.clashes,
+        )
+        stop = self._stop
+        popcount = _popcount
+        live = self.live
+        columns = self.columns
+        chosen = []
+        # Per chosen row: the live rows and open columns before it was
+        # picked, and the rows of its column still to try
+        stack = []
+        while True:
+            if stop is not None and stop():
+                return
+            if columns:
+                # Branch on the column with the fewest live rows
+                rows = None
+                fewest = len(self.placements) + 1
+                remaining = columns
+                while remaining:
+                    low = remaining & -remaining
+                    remaining ^= low
+                    candidates = column_rows[low.bit_length() - 1] & live
+                    count = popcount(candidates)
+                    if count < fewest:
+                        rows, fewest = candidates, count
+                        if count <= 1:
+                            break
+            else:
+                yield chosen
+                rows = 0
+
+            # Back up to the deepest column with rows left to try
+            while not rows:
+                if not stack:
+                    return
+                live, columns, rows = stack.pop()
+                chosen.pop()
+
+            low = rows & -rows
+            row = low.bit_length() - 1
+            stack.append((live, columns, rows ^ low))
+            chosen.append(row)
+            live &= ~clashes[row]
+            columns &= ~row_columns[row]
+
+    def solutions(self, stop=None):
+        """Stream every solution as a list of placements
+
+        stop is an optional callable checked at every search node; the
+        search ends early once it returns true.
+        """
+        placements = self.placements
+        self._stop = stop
+        for rows in self._search():
+            yield [placements[row] for row in rows]
+
+    def solve(self, stop=None):
+        """Get the first solution found, or None if there is none (or stop fired)"""
+        return next(self.solutions(stop), None)
+
+    def count(self, limit=None):
+        """Count every solution, or stop once limit solutions are found
+
+        limit is None for no limit; it must otherwise be at least 1.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError(f"limit must be None or at least 1, not {limit}")
+        found = 0
+        self._stop = None
+        for _ in self._search():
+            found += 1
+            if found == limit:
+                break
+        return found
+
+    @classmethod
+    def from_board(cls, board):
+        """Build a solver for the current state of a Board"""
+        return cls(board.grid, board.available_pieces)
+
+
+class TranspositionTable:
+    """Bounded LRU cache of search results"""
+
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Get a cached value, or None if it is not cached"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Cache a value, evicting the least recently used if full"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class CompletionCounter:
+    """Count the ways to finish a board, memoized across queries
+
+    The search fills the lowest empty cell first and rejects a state as
+    soon as the empty cells split into a region no set of remaining pieces
+    can fill. Counts are per arrangement of piece kinds and are cached on
+    (occupancy mask, sorted remaining kinds), or on the canonical form of
+    that state when a Symmetry of the board is given, so symmetric states
+    share one entry.
+    """
+
+    def __init__(self, playable, width, height, maxsize=100_000, symmetry=None):
+        self.playable = playable
+        self.width = width
+        self.height = height
+        self.table = TranspositionTable(maxsize)
+        self.symmetry = symmetry
+        self._low_cell = {}
+
+    def _placements_from(self, kind):
+        """Get a kind's placement masks grouped by their lowest cell"""
+        by_cell = self._low_cell.get(kind)
+        if by_cell is None:
+            by_cell = [[] for _ in range(self.width * self.height)]
+            for orientation in range(len(KINDS[kind].orientations)):
+                for anchor in anchors(
+                    kind, orientation, self.playable, self.width, self.height
+                ):
+                    by_cell[min(anchor.bits)].append(anchor.mask)
+            by_cell = tuple(tuple(masks) for masks in by_cell)
+            self._low_cell[kind] = by_cell
+        return by_cell
+
+    def _is_dead(self, free, kinds):
+        """Check if the empty cells can be ruled out without searching"""
+        sizes = [len(KINDS[kind].orientations[0].cells) for kind in kinds]
+        if bin(free).count("1") != sum(sizes):
+            return True
+        step = 0
+        for size in sizes:
+            step = gcd(step, size)
+        smallest = min(sizes)
+        for region in regions(free, self.width, self.height):
+            cells = bin(region).count("1")
+            if cells < smallest or cells % step:
+                return True
+        return False
+
+    def count(self, occupied, kinds):
+        """Count the ways to fill every empty cell with the given piece kinds"""
+        kinds = tuple(sorted(kinds))
+        free = self.playable & ~occupied
+        if not kinds:
+            return 0 if free else 1
+        if self.symmetry is None:
+            key = (occupied, kinds)
+        else:
+            key = self.symmetry.canonical_state(occupied, kinds)
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+
+        total = 0
+        if not self._is_dead(free, kinds):
+            # Every solution covers the lowest empty cell with some piece
+            # whose own lowest cell is that cell
+            cell = (free & -free).bit_length() - 1
+            for index, kind in enumerate(kinds):
+                if index and kind == kinds[index - 1]:
+                    continue
+                rest = kinds[:index] + kinds[index + 1 :]
+                for mask in self._placements_from(kind)[cell]:
+                    if mask & free == mask:
+                        total += self.count(occupied | mask, rest)
+
+        self.table.put(key, total)
+        return total
+
+    def is_solvable(self, occupied, kinds):
+        """Check if the given piece kinds can fill every empty cell"""
+        return self.count(occupied, kinds) > 0
+
+
+@lru_cache(maxsize=8)
+def completion_counter(playable, width, height, kinds):
+    """Get the shared completion counter for a board shape and piece set
+
+    kinds is the sorted tuple of the full piece set. On boards large enough
+    for it to pay off (Symmetry.worthwhile), states that a symmetry of the
+    board and pieces maps onto each other share one cache entry.
+    """
+    # Imported here because symmetry imports this module
+    from .symmetry import Symmetry
+
+    symmetry = Symmetry(playable, width, height, kinds)
+    return CompletionCounter(
+        playable, width, height, symmetry=symmetry if symmetry.worthwhile else None
+    )
+
+
+def benchmark(mode, repeat):
+    """Time a solver mode on a fresh board and print the throughput"""
+    from .board import Board
+
+    board = Board(initialize_pygame=False)
+
+    # Matrix construction and search are timed separately; the matrix
+    # cache is cleared so every build is a real one
+    build_time = 0.0
+    for _ in range(repeat):
+        _matrix.cache_clear()
+        start = time.perf_counter()
+        solver = Solver.from_board(board)
+        build_time += time.perf_counter() - start
+    build_time /= repeat
+
+    found = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        if mode == "first":
+            found += solver.solve() is not None
+        elif mode == "count":
+            found += solver.count()
+        else:
+            found += sum(1 for _ in solver.solutions())
+    elapsed = time.perf_counter() - start
+
+    print(f"mode:            {mode}")
+    print(f"runs:            {repeat}")
+    print(f"placements:      {len(solver.placements)}")
+    print(f"solutions:       {found}")
+    print(f"build per run:   {build_time * 1000:.3f} ms")
+    print(f"solve per run:   {elapsed / repeat * 1000:.3f} ms")
+    print(f"solutions / sec: {found / elapsed:,.0f}")
+
+
+def main():
+    """Command line entry point: solve the stock board and report timings"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solve the stock puzzle board")
+    parser.add_argument("--mode", choices=("first", "count", "iter"), default="first")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+    benchmark(args.mode, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Positions of the pieces in the selection strip
+
+Pieces sit side by side with one empty cell between them. StripLayout
+keeps the left edge of every piece as a prefix sum, so hit-testing and
+finding the pieces inside the scroll window are bisections. Removing or
+rotating a piece shifts only the pieces after it.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+class StripLayout:
+    """Cached x offsets of the available pieces in strip coordinates"""
+
+    def __init__(self, cell_size, padding):
+        self.cell_size = cell_size
+        self.padding = padding
+        # Left edge and width in pixels of every piece, in strip order
+        self.starts = []
+        self.widths = []
+        self.heights = []
+        # Bumped on every change so drawing code can tell the strip moved
+        self.version = 0
+
+    def rebuild(self, pieces):
+        """Lay out a whole list of pieces from scratch"""
+        cell_size = self.cell_size
+        self.starts = []
+        self.widths = [piece.width * cell_size for piece in pieces]
+        self.heights = [piece.height * cell_size for piece in pieces]
+        x = self.padding
+        for width in self.widths:
+            self.starts.append(x)
+            x += width + cell_size
+        self.version += 1
+
+    def remove(self, index):
+        """Drop the piece at an index and close the gap"""
+        shift = self.widths[index] + self.cell_size
+        del self.starts[index]
+        del self.widths[index]
+        del self.heights[index]
+        starts = self.starts
+        for i in range(index, len(starts)):
+            starts[i] -= shift
+        self.version += 1
+
+    def resize(self, index, piece):
+        """Update a piece's size after a rotation"""
+        width = piece.width * self.cell_size
+        shift = width - self.widths[index]
+        self.widths[index] = width
+        self.heights[index] = piece.height * self.cell_size
+        if shift:
+            starts = self.starts
+            for i in range(index + 1, len(starts)):
+                starts[i] += shift
+        self.version += 1
+
+    def width(self):
+        """Get the width of all pieces laid out with their gaps"""
+        if not self.starts:
+            return -self.cell_size
+        return self.starts[-1] + self.widths[-1] - self.padding
+
+    def piece_at(self, x, y):
+        """Get the index of the piece at a strip position (y from the piece row top), or None"""
+        index = bisect_right(self.starts, x) - 1
+        if (
+            index >= 0
+            and x < self.starts[index] + self.widths[index]
+            and 0 <= y < self.heights[index]
+        ):
+            return index
+        return None
+
+    def visible(self, scroll, window_width):
+        """Get the range of piece indices that overlap the scroll window"""
+        first = max(0, bisect_right(self.starts, scroll) - 1)
+        if (
+            first < len(self.starts)
+            and self.starts[first] + self.widths[first] <= scroll
+        ):
+            first += 1
+        return range(first, bisect_left(self.starts, scroll + window_width))
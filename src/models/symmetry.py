@@ -0,0 +1,317 @@
+"""Board symmetries and symmetry-reduced solution enumeration
+
+A symmetry is a rotation or reflection of the board that maps its free
+cells onto themselves, paired with the kind relabelling it implies (a
+mirror turns an S into a Z and one L into the other). It is only kept if
+the relabelling leaves the piece set unchanged, so it maps every solution
+to another solution.
+
+Solutions and board states get a canonical form: the smallest of their
+images under every symmetry. Enumeration fixes one piece whose kind every
+symmetry keeps, tries it only in one placement per orbit, and keeps the
+canonical form of each solution found, which leaves one solution per
+symmetry class. expand() recovers every solution from the classes. On
+small boards (see MIN_REDUCED_CELLS) every solution is searched for and
+canonicalized instead, which is faster there.
+
+    python -m src.models.symmetry --puzzle classic --check
+"""
+
+import time
+from collections import Counter, namedtuple
+
+from .bitboard import grid_masks
+from .piece import KINDS, anchors
+from .solver import Placement, Solver
+
+# Boards with fewer free cells than this search fast enough that working
+# up to symmetry costs more than it saves (classic: 28 cells, pentominoes: 60)
+MIN_REDUCED_CELLS = 40
+
+# A board symmetry: its name, the image of every cell bit and the image
+# of every kind
+Transform = namedtuple("Transform", "name cells kinds")
+
+# Cell maps as (name, swaps rows and columns, f(row, col, height, width))
+_GEOMETRY = (
+    ("identity", False, lambda r, c, h, w: (r, c)),
+    ("mirror", False, lambda r, c, h, w: (r, w - 1 - c)),
+    ("flip", False, lambda r, c, h, w: (h - 1 - r, c)),
+    ("rotate180", False, lambda r, c, h, w: (h - 1 - r, w - 1 - c)),
+    ("transpose", True, lambda r, c, h, w: (c, r)),
+    ("rotate90", True, lambda r, c, h, w: (c, h - 1 - r)),
+    ("rotate270", True, lambda r, c, h, w: (w - 1 - c, r)),
+    ("antitranspose", True, lambda r, c, h, w: (w - 1 - c, h - 1 - r)),
+)
+
+
+def _shape_image(cells, height, width, fn):
+    """Get the normalized cells of a shape after a cell map"""
+    return frozenset(fn(row, col, height, width) for row, col in cells)
+
+
+def _kind_image(kind, candidates, fn):
+    """Find the kind whose orientations include the image of a kind's shape"""
+    shape = KINDS[kind].orientations[0]
+    image = _shape_image(shape.cells, shape.height, shape.width, fn)
+    # Prefer the kind itself so symmetric pieces keep their identity
+    for other in (kind,) + tuple(candidates):
+        if any(frozenset(o.cells) == image for o in KINDS[other].orientations):
+            return other
+    return None
+
+
+class Symmetry:
+    """The symmetries of a board and its piece set"""
+
+    def __init__(self, free, width, height, kinds):
+        self.free = free
+        self.width = width
+        self.height = height
+        self.kinds = tuple(kinds)
+        counts = Counter(self.kinds)
+
+        self.transforms = []
+        for name, swap, fn in _GEOMETRY:
+            if swap and width != height:
+                continue
+            cells = tuple(
+                r * width + c
+                for r, c in (
+                    fn(bit // width, bit % width, height, width)
+                    for bit in range(width * height)
+                )
+            )
+            if self._apply(cells, free) != free:
+                continue
+            kind_map = {kind: _kind_image(kind, counts, fn) for kind in counts}
+            if None in kind_map.values():
+                continue
+            if Counter(kind_map[kind] for kind in self.kinds) != counts:
+                continue
+            self.transforms.append(Transform(name, cells, kind_map))
+
+        # Lookup tables that move 8 cells at a time, per transform
+        self._tables = [self._byte_tables(t.cells) for t in self.transforms]
+
+    @staticmethod
+    def _apply(cells, mask):
+        """Move every cell of a mask bit by bit"""
+        image = 0
+        while mask:
+            low = mask & -mask
+            image |= 1 << cells[low.bit_length() - 1]
+            mask ^= low
+        return image
+
+    def _byte_tables(self, cells):
+        """Build one 256-entry image table per 8 cells"""
+        tables = []
+        for start in range(0, len(cells), 8):
+            chunk = cells[start : start + 8]
+            tables.append(
+                tuple(
+                    sum(1 << chunk[i] for i in range(len(chunk)) if value >> i & 1)
+                    for value in range(1 << len(chunk))
+                )
+            )
+        return tuple(tables)
+
+    @classmethod
+    def from_board(cls, board):
+        """Get the symmetries of a board's empty cells and remaining pieces"""
+        playable, occupied = grid_masks(board.grid)
+        return cls(
+            playable & ~occupied,
+            len(board.grid[0]),
+            len(board.grid),
+            [piece.kind for piece in board.available_pieces],
+        )
+
+    @property
+    def order(self):
+        """Number of symmetries, the identity included"""
+        return len(self.transforms)
+
+    @property
+    def worthwhile(self):
+        """Check if searching up to symmetry should beat searching directly"""
+        return self.order > 1 and bin(self.free).count("1") >= MIN_REDUCED_CELLS
+
+    def transform(self, index, mask):
+        """Get the image of a cell mask under one symmetry"""
+        image = 0
+        for table in self._tables[index]:
+            image |= table[mask & 0xFF]
+            mask >>= 8
+            if not mask:
+                break
+        return image
+
+    def image(self, index, key):
+        """Get the image of a solution key under one symmetry"""
+        kind_map = self.transforms[index].kinds
+        return tuple(
+            sorted((kind_map[kind], self.transform(index, mask)) for kind, mask in key)
+        )
+
+    def canonical(self, key):
+        """Get the canonical form of a solution key"""
+        return min(self.image(index, key) for index in range(self.order))
+
+    def orbit(self, key):
+        """Get every distinct image of a solution key"""
+        return {self.image(index, key) for index in range(self.order)}
+
+    def canonical_state(self, occupied, kinds):
+        """Get a hashable key shared by every symmetric image of a board state"""
+        best = None
+        for index, t in enumerate(self.transforms):
+            image = self.transform(index, occupied)
+            # Only relabel the kinds of images that can still be the smallest
+            if best is not None and image > best[0]:
+                continue
+            state = (image, tuple(sorted(t.kinds[kind] for kind in kinds)))
+            if best is None or state < best:
+                best = state
+        return best
+
+    def representatives(self, masks):
+        """Keep one mask per orbit of a symmetric piece's placements"""
+        return sorted(
+            mask
+            for mask in set(masks)
+            if all(
+                self.transform(index, mask) >= mask for index in range(1, self.order)
+            )
+        )
+
+    def pivot(self):
+        """Pick the single piece kind every symmetry maps to itself, if any
+
+        The kind with the fewest placement orbits gives the smallest search.
+        """
+        counts = Counter(self.kinds)
+        best = None
+        for kind, count in counts.items():
+            if count != 1 or any(t.kinds[kind] != kind for t in self.transforms):
+                continue
+            masks = self.placement_masks(kind)
+            size = len(self.representatives(masks))
+            if best is None or size < best[1]:
+                best = (kind, size)
+        return None if best is None else best[0]
+
+    def placement_masks(self, kind):
+        """Get every mask a kind can cover on the free cells"""
+        return [
+            anchor.mask
+            for orientation in range(len(KINDS[kind].orientations))
+            for anchor in anchors(kind, orientation, self.free, self.width, self.height)
+        ]
+
+
+def solution_key(solution, pieces):
+    """Convert a list of placements into a hashable (kind, mask) key"""
+    return tuple(sorted((pieces[p.piece].kind, p.mask) for p in solution))
+
+
+def unique_solutions(grid, pieces, symmetry=None):
+    """Get one canonical solution key per symmetry class
+
+    Returns the symmetry used and the sorted class representatives.
+    """
+    pieces = list(pieces)
+    if symmetry is None:
+        playable, occupied = grid_masks(grid)
+        symmetry = Symmetry(
+            playable & ~occupied,
+            len(grid[0]),
+            len(grid),
+            [piece.kind for piece in pieces],
+        )
+
+    restrict = None
+    pivot = symmetry.pivot() if symmetry.worthwhile else None
+    if pivot is not None:
+        index = next(i for i, piece in enumerate(pieces) if piece.kind == pivot)
+        restrict = {
+            index: set(symmetry.representatives(symmetry.placement_masks(pivot)))
+        }
+
+    classes = set()
+    for solution in Solver(grid, pieces, restrict).solutions():
+        classes.add(symmetry.canonical(solution_key(solution, pieces)))
+    return symmetry, sorted(classes)
+
+
+def expand(symmetry, classes):
+    """Get every solution key from the class representatives"""
+    for key in classes:
+        yield from sorted(symmetry.orbit(key))
+
+
+def to_placements(key, pieces, width):
+    """Convert a solution key back into placements of the given pieces"""
+    unused = list(range(len(pieces)))
+    result = []
+    for kind, mask in key:
+        index = next(i for i in unused if pieces[i].kind == kind)
+        unused.remove(index)
+        bits = [bit for bit in range(mask.bit_length()) if mask >> bit & 1]
+        row = min(bit // width for bit in bits)
+        col = min(bit % width for bit in bits)
+        cells = frozenset((bit // width - row, bit % width - col) for bit in bits)
+        orientation = next(
+            o
+            for o, shape in enumerate(KINDS[kind].orientations)
+            if frozenset(shape.cells) == cells
+        )
+        # Anchors are the top-left corner of the shape's bounding box
+        result.append(Placement(index, orientation, row, col, mask))
+    result.sort(key=lambda p: p.piece)
+    return result
+
+
+def main():
+    """Command line entry point: enumerate a puzzle's solution classes"""
+    import argparse
+
+    from .game_state import GameState
+    from .puzzle import get_puzzle
+
+    parser = argparse.ArgumentParser(description="Enumerate solutions up to symmetry")
+    parser.add_argument("--puzzle", default=None, help="puzzle name or JSON file")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="also enumerate every solution directly and compare",
+    )
+    args = parser.parse_args()
+
+    state = GameState(get_puzzle(args.puzzle))
+    start = time.perf_counter()
+    symmetry, classes = unique_solutions(state.grid, state.available_pieces)
+    total = sum(len(symmetry.orbit(key)) for key in classes)
+    elapsed = time.perf_counter() - start
+
+    names = ", ".join(t.name for t in symmetry.transforms)
+    print(f"symmetries:      {symmetry.order} ({names})")
+    print(f"classes:         {len(classes)}")
+    print(f"solutions:       {total}")
+    print(f"reduced search:  {elapsed:.3f} s")
+
+    if args.check:
+        start = time.perf_counter()
+        solver = Solver.from_board(state)
+        direct = {solution_key(s, state.available_pieces) for s in solver.solutions()}
+        elapsed = time.perf_counter() - start
+        expanded = set(expand(symmetry, classes))
+        print(f"full search:     {elapsed:.3f} s, {len(direct)} solutions")
+        print("match" if direct == expanded else "MISMATCH")
+        if direct != expanded:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Generate puzzle packs in parallel: python -m src.tools.generate
+
+Each seed carves a random connected board out of the base puzzle and picks
+a random subset of its pieces that exactly covers it. Variants with exactly
+one solution are written to a JSON Lines file, one puzzle per line, in the
+same format as the puzzle files (plus "seed" and "solution"), so any line
+can be loaded with Puzzle.from_dict.
+
+Seeds are split into chunks that run on a process pool. Results are
+appended as chunks finish, and a checkpoint file records which chunks are
+done and how long the output was after each, so an interrupted run resumes
+where it stopped without duplicating lines.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ..models.bitboard import cell_bit, regions
+from ..models.piece import KINDS, anchors
+from ..models.puzzle import Puzzle, get_puzzle
+from ..models.solver import Solver
+
+# Base puzzle used by this worker process
+_base = None
+
+
+def _init_worker(puzzle_name):
+    global _base
+    _base = get_puzzle(puzzle_name)
+
+
+def _carve(rng, base, cells_needed):
+    """Remove random edge cells from the base board until cells_needed are left
+
+    Returns the set of removed (row, col) cells, keeping the board in one piece.
+    """
+    width, height = base.width, base.height
+    playable = base.playable
+    removed = set(base.missing)
+    while bin(playable).count("1") > cells_needed:
+        # Cells next to the outside or to an already removed cell
+        edge = [
+            (row, col)
+            for row in range(height)
+            for col in range(width)
+            if playable & cell_bit(row, col, width)
+            and any(
+                not (0 <= r < height and 0 <= c < width) or (r, c) in removed
+                for r, c in (
+                    (row - 1, col),
+                    (row + 1, col),
+                    (row, col - 1),
+                    (row, col + 1),
+                )
+            )
+        ]
+        rng.shuffle(edge)
+        for row, col in edge:
+            candidate = playable & ~cell_bit(row, col, width)
+            if len(regions(candidate, width, height)) == 1:
+                playable = candidate
+                removed.add((row, col))
+                break
+        else:
+            return None
+    return removed
+
+
+def make_variant(seed, base, min_pieces):
+    """Build the puzzle variant for a seed and return its record if it has one solution"""
+    rng = random.Random(seed)
+    count = rng.randint(min(min_pieces, len(base.kinds)), len(base.kinds))
+    kinds = sorted(rng.sample(range(len(base.kinds)), count))
+    kinds = [base.kinds[index] for index in kinds]
+    cells_needed = sum(len(KINDS[kind].orientations[0].cells) for kind in kinds)
+
+    removed = _carve(rng, base, cells_needed)
+    if removed is None:
+        return None
+
+    pieces = [
+        (KINDS[kind].name, KINDS[kind].orientations[0].shape, KINDS[kind].color)
+        for kind in kinds
+    ]
+    puzzle = Puzzle(
+        f"{base.name}_{seed}",
+        base.width,
+        base.height,
+        pieces,
+        sorted(removed),
+        base.flip,
+    )
+    # Only the grid and pieces: a GameState would also build its per-board tables
+    solver = Solver(puzzle.new_grid(), puzzle.create_pieces())
+    if solver.count(limit=2) != 1:
+        return None
+    solution = solver.solve()
+
+    return {
+        "name": puzzle.name,
+        "seed": seed,
+        "width": puzzle.width,
+        "height": puzzle.height,
+        "missing": [list(cell) for cell in puzzle.missing],
+        "flip": puzzle.flip,
+        "pieces": [
+            {
+                "name": name,
+                "color": list(color),
+                "shape": [
+                    "".join("#" if cell else "." for cell in row) for row in shape
+                ],
+            }
+            for name, shape, color in pieces
+        ],
+        "solution": [[p.piece, p.orientation, p.row, p.col] for p in solution],
+    }
+
+
+def run_chunk(chunk, start_seed, seeds, chunk_size, min_pieces):
+    """Generate the puzzles for one chunk of seeds (runs in a worker process)"""
+    first = start_seed + chunk * chunk_size
+    records = []
+    # The last chunk stops at the requested number of seeds
+    for seed in range(first, min(first + chunk_size, start_seed + seeds)):
+        record = make_variant(seed, _base, min_pieces)
+        # Every seed carves a new board, so its anchors won't be asked for again
+        anchors.cache_clear()
+        if record is not None:
+            records.append(record)
+    return chunk, records
+
+
+def read_checkpoint(path):
+    """Get the finished chunks and the output length after the last one"""
+    done = set()
+    offset = 0
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                chunk, end = line.split()
+                done.add(int(chunk))
+                offset = max(offset, int(end))
+    return done, offset
+
+
+def generate(args):
+    """Run the generator and return the number of puzzles written"""
+    chunk_count = -(-args.seeds // args.chunk)
+    checkpoint_path = args.checkpoint or args.out + ".checkpoint"
+    if args.resume:
+        done, offset = read_checkpoint(checkpoint_path)
+    else:
+        done, offset = set(), 0
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    # Drop anything written after the last checkpoint
+    mode = "r+" if args.resume and os.path.exists(args.out) else "w"
+    out = open(args.out, mode)
+    out.truncate(offset)
+    out.seek(offset)
+    checkpoint = open(checkpoint_path, "a")
+
+    pending_chunks = (chunk for chunk in range(chunk_count) if chunk not in done)
+    written = 0
+    finished = len(done)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        args.workers, initializer=_init_worker, initargs=(args.puzzle,)
+    ) as pool:
+        # Keep a bounded number of chunks in flight
+        in_flight = set()
+        limit = 2 * (args.workers or os.cpu_count() or 1)
+        while True:
+            for chunk in pending_chunks:
+                in_flight.add(
+                    pool.submit(
+                        run_chunk,
+                        chunk,
+                        args.start_seed,
+                        args.seeds,
+                        args.chunk,
+                        args.min_pieces,
+                    )
+                )
+                if len(in_flight) >= limit:
+                    break
+            if not in_flight:
+                break
+            finished_now, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished_now:
+                chunk, records = future.result()
+                for record in records:
+                    out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint.write(f"{chunk} {out.tell()}\n")
+                checkpoint.flush()
+                written += len(records)
+                finished += 1
+                elapsed = time.perf_counter() - start
+                print(
+                    f"\rchunks {finished}/{chunk_count}  puzzles {written}  "
+                    f"{written / elapsed:,.1f}/s",
+                    end="",
+                    file=sys.stderr,
+                )
+
+    out.close()
+    checkpoint.close()
+    print(file=sys.stderr)
+    return written
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Generate puzzles with a unique solution"
+    )
+    parser.add_argument("--out", default="puzzles.jsonl", help="JSON Lines output file")
+    parser.add_argument(
+        "--puzzle", default="classic", help="base puzzle name or JSON file"
+    )
+    parser.add_argument(
+        "--seeds", type=int, default=10_000, help="number of seeds to try"
+    )
+    parser.add_argument("--start-seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=200, help="seeds per worker task")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: CPUs)"
+    )
+    parser.add_argument("--min-pieces", type=int, default=4)
+    parser.add_argument(
+        "--checkpoint", help="checkpoint file (default: OUT.checkpoint)"
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="continue an interrupted run"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = generate(args)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{written} new puzzles in {elapsed:.1f}s ({written / elapsed:,.1f} puzzles/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Render solved boards into sprite-atlas PNGs: python -m src.tools.render_atlas
+
+Input is either a JSON Lines pack from src.tools.generate (one puzzle and
+its solution per line) or a puzzle name, in which case every solution of
+that puzzle is rendered. Boards are drawn with the game's colours and grid
+lines straight onto one atlas page surface per worker process, which is
+reused for every page that worker renders; no window is opened.
+
+Each page is a grid of equal tiles saved as atlas_NNNN.png. atlas.json
+maps every board name to its page and tile rectangle.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from ..models.piece import KINDS
+from ..models.puzzle import Puzzle, get_puzzle
+from ..models.solver import Solver
+from ..ui.render_cache import draw_cells
+from ..utils.constants import BG_COLOR, CELL_SIZE
+
+# Page surface reused by this worker process, keyed on its size
+_page = None
+
+
+def solved_grid(record):
+    """Build the colour grid of a puzzle record with its solution filled in"""
+    puzzle = Puzzle.from_dict(record)
+    grid = puzzle.new_grid()
+    for piece, orientation, row, col in record["solution"]:
+        kind = puzzle.kinds[piece]
+        color = KINDS[kind].color
+        for r, c in KINDS[kind].orientations[orientation].cells:
+            grid[row + r][col + c] = color
+    return grid
+
+
+def render_page(page, records, tile, columns, cell_size, out_dir):
+    """Draw one atlas page and save it; returns the index entries for its boards"""
+    global _page
+    tile_width, tile_height = tile
+    rows = -(-len(records) // columns)
+    size = (columns * tile_width, rows * tile_height)
+    if _page is None or _page.get_size() != size:
+        _page = pygame.Surface(size)
+    _page.fill(BG_COLOR)
+
+    entries = {}
+    for index, record in enumerate(records):
+        x = (index % columns) * tile_width
+        y = (index // columns) * tile_height
+        # One-cell margin is already part of the tile
+        left = x + cell_size // 2
+        top = y + cell_size // 2
+        draw_cells(
+            _page,
+            solved_grid(record),
+            lambda row, col: (
+                left + col * cell_size,
+                top + row * cell_size,
+                cell_size,
+                cell_size,
+            ),
+        )
+        entries[record["name"]] = [page, x, y, tile_width, tile_height]
+
+    path = os.path.join(out_dir, f"atlas_{page:04d}.png")
+    pygame.image.save(_page, path)
+    return page, path, entries
+
+
+def read_pack(path):
+    """Read the puzzle records of a generated pack"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def puzzle_solutions(name):
+    """Turn every solution of a puzzle into a pack-style record"""
+    from ..models.game_state import GameState
+
+    puzzle = get_puzzle(name)
+    data = puzzle.to_dict()
+    records = []
+    for index, solution in enumerate(Solver.from_board(GameState(puzzle)).solutions()):
+        records.append(
+            dict(
+                data,
+                name=f"{puzzle.name}_{index:05d}",
+                solution=[[p.piece, p.orientation, p.row, p.col] for p in solution],
+            )
+        )
+    return records
+
+
+def render(records, out_dir, cell_size=CELL_SIZE, columns=32, rows=32, workers=None):
+    """Render records onto atlas pages in parallel and write the index"""
+    os.makedirs(out_dir, exist_ok=True)
+    # Every tile fits the largest board plus half a cell of margin each side
+    tile = (
+        (max(r["width"] for r in records) + 1) * cell_size,
+        (max(r["height"] for r in records) + 1) * cell_size,
+    )
+    per_page = columns * rows
+    pages = [
+        records[start : start + per_page] for start in range(0, len(records), per_page)
+    ]
+
+    index = {"tile": list(tile), "cell_size": cell_size, "pages": [], "boards": {}}
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(render_page, page, chunk, tile, columns, cell_size, out_dir)
+            for page, chunk in enumerate(pages)
+        ]
+        for future in futures:
+            page, path, entries = future.result()
+            index["pages"].append(os.path.basename(path))
+            index["boards"].update(entries)
+
+    with open(os.path.join(out_dir, "atlas.json"), "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    return index
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Render solved boards into atlas PNGs")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pack", help="JSON Lines pack from src.tools.generate")
+    source.add_argument("--puzzle", help="render every solution of a puzzle")
+    parser.add_argument("--out", default="atlas", help="output directory")
+    parser.add_argument(
+        "--cell-size",
+        type=int,
+        default=CELL_SIZE // 4,
+        help="pixels per board cell (default %(default)s)",
+    )
+    parser.add_argument("--columns", type=int, default=32, help="tiles per atlas row")
+    parser.add_argument("--rows", type=int, default=32, help="tile rows per atlas page")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: CPUs)"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = read_pack(args.pack) if args.pack else puzzle_solutions(args.puzzle)
+    if not records:
+        print("nothing to render", file=sys.stderr)
+        return 1
+    index = render(
+        records, args.out, args.cell_size, args.columns, args.rows, args.workers
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(records)} boards on {len(index['pages'])} atlas pages in {elapsed:.2f}s "
+        f"({len(records) / elapsed:,.0f} boards/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Replay recorded sessions: python -m src.tools.replay LOG [LOG ...]
+
+Without --ui every log runs headless through the game-state model and its
+outcome is printed, which is fast enough to check thousands of games.
+With --ui the first log plays back in the game window at the speed it was
+recorded (scaled by --speed).
+"""
+
+import argparse
+import sys
+import time
+
+from ..models.game_state import GameState
+from ..models.move_log import OPCODE_NAMES, PLACE, apply, read_log, replay
+from ..models.puzzle import get_puzzle
+
+
+def check(paths, puzzle_name=None, verbose=False):
+    """Replay logs headless and print one outcome line per log"""
+    puzzles = {}
+    games = failures = 0
+    start = time.perf_counter()
+    for path in paths:
+        name, events = read_log(path)
+        name = puzzle_name or name
+        puzzle = puzzles.get(name)
+        if puzzle is None:
+            puzzle = puzzles[name] = get_puzzle(name)
+        # A fresh state per log, so no history or caches carry over between logs
+        state = GameState(puzzle)
+        if verbose:
+            for index, event in enumerate(events):
+                print(
+                    f"{index:5d} +{event.delay:6d}ms {OPCODE_NAMES[event.op]:6s} "
+                    f"{' '.join(map(str, event.args))}"
+                )
+        try:
+            replay(state, events)
+        except (ValueError, IndexError) as error:
+            failures += 1
+            print(f"{path}: FAILED {error}")
+            continue
+        games += 1
+        placed = sum(1 for event in events if event.op == PLACE)
+        outcome = (
+            "won" if state.has_won else f"{len(state.available_pieces)} pieces left"
+        )
+        print(f"{path}: {len(events)} events, {placed} placements, {outcome}")
+    elapsed = time.perf_counter() - start
+    print(
+        f"{games} games replayed in {elapsed:.3f}s ({games / elapsed:,.0f} games/s)",
+        file=sys.stderr,
+    )
+    return failures
+
+
+def play(path, puzzle_name=None, speed=1.0):
+    """Play a log back in the game window"""
+    import pygame
+
+    from ..ui.game import Game
+
+    name, events = read_log(path)
+    game = Game(puzzle=get_puzzle(puzzle_name or name), hints=False)
+    board = game.board
+    # The same fresh start as headless replay
+    board.new_game()
+    due = time.perf_counter()
+    try:
+        for event in events:
+            due += event.delay / 1000 / speed
+            # Keep the window responsive while waiting for the next event
+            while time.perf_counter() < due:
+                for window_event in pygame.event.get():
+                    if window_event.type == pygame.QUIT:
+                        return
+                game.clock.tick(game.fps)
+            apply(board, event)
+            board.display()
+
+        # Leave the final board up until the window is closed
+        while not any(e.type == pygame.QUIT for e in pygame.event.get()):
+            board.display()
+            game.clock.tick(game.fps)
+    finally:
+        pygame.quit()
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Replay recorded game sessions")
+    parser.add_argument("logs", nargs="+", help="move log files")
+    parser.add_argument(
+        "--puzzle", help="puzzle to replay on (default: the one logged)"
+    )
+    parser.add_argument(
+        "--ui", action="store_true", help="play the first log in the game window"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="playback speed for --ui"
+    )
+    parser.add_argument("--events", action="store_true", help="print every event")
+    args = parser.parse_args()
+
+    if args.ui:
+        play(args.logs[0], args.puzzle, args.speed)
+        return 0
+    return 1 if check(args.logs, args.puzzle, args.events) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
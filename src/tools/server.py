@@ -0,0 +1,459 @@
+"""Headless multi-session game server: python -m src.tools.server serve
+
+One asyncio process hosts many games at once, each a pygame-free
+GameState, and takes commands over a local TCP or Unix socket. Messages
+are fixed-size binary frames. Commands reuse the move log opcodes and
+payloads (see models/move_log.py), addressed to a session::
+
+    request   opcode (1 byte) | session id (4 bytes LE) | payload
+
+    SELECT  piece index                   1 byte
+    ROTATE  piece index                   1 byte
+    PLACE   piece index, row, col         3 bytes
+    RESET   -
+    UNDO    -
+    REDO    -
+    OPEN    -      start a session; the reply carries its id
+    CLOSE   -      end a session
+
+    response  status (1 byte) | session id (4 bytes LE) | pieces left (1 byte) | won (1 byte)
+
+Replies come back in request order on each connection, so a client can
+pipeline commands for many sessions over one socket. Placements are
+checked with GameState.can_place, the rule behind is_valid_position. A
+session nobody has sent a command to for idle_timeout seconds is dropped,
+as is the least recently used one when max_sessions is reached.
+
+python -m src.tools.server load starts a server process (or uses a
+running one with --external), drives thousands of sessions with random
+commands and reports commands per second and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+from collections import OrderedDict, deque
+
+from ..models.game_state import GameState
+from ..models.move_log import (
+    PAYLOAD_SIZES,
+    PLACE,
+    REDO,
+    RESET,
+    ROTATE,
+    SELECT,
+    UNDO,
+    Event,
+    apply,
+)
+from ..models.puzzle import get_puzzle
+
+OPEN, CLOSE = 0x10, 0x11
+
+OK, ILLEGAL, NO_SESSION, BAD_REQUEST = range(4)
+STATUS_NAMES = ("ok", "illegal", "no session", "bad request")
+
+REQUEST = struct.Struct("<BI")
+RESPONSE = struct.Struct("<BIBB")
+
+# Payload size of every opcode the server accepts
+PAYLOAD_SIZE = dict(enumerate(PAYLOAD_SIZES))
+PAYLOAD_SIZE[OPEN] = PAYLOAD_SIZE[CLOSE] = 0
+
+DEFAULT_PORT = 7878
+
+
+def request(op, session=0, args=()):
+    """Encode a request frame"""
+    return REQUEST.pack(op, session) + bytes(args)
+
+
+class Session:
+    """One hosted game and when it was last used"""
+
+    __slots__ = ("state", "last_seen")
+
+    def __init__(self, state, now):
+        self.state = state
+        self.last_seen = now
+
+
+class SessionServer:
+    """Game sessions keyed on id, in least recently used order"""
+
+    def __init__(self, puzzle=None, idle_timeout=300.0, max_sessions=100_000):
+        self.puzzle = puzzle if puzzle is not None else get_puzzle()
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self._ids = itertools.count(1)
+        self.commands = 0
+        self.evicted = 0
+
+    def handle(self, op, session_id, args, now):
+        """Run one command and return the response frame"""
+        self.commands += 1
+        sessions = self.sessions
+        if op == OPEN:
+            if len(sessions) >= self.max_sessions:
+                sessions.popitem(last=False)
+                self.evicted += 1
+            session_id = next(self._ids) & 0xFFFFFFFF
+            session = sessions[session_id] = Session(GameState(self.puzzle), now)
+        else:
+            session = sessions.get(session_id)
+            if session is None:
+                return RESPONSE.pack(NO_SESSION, session_id, 0, 0)
+            if op == CLOSE:
+                del sessions[session_id]
+                return RESPONSE.pack(OK, session_id, 0, 0)
+            session.last_seen = now
+            sessions.move_to_end(session_id)
+            try:
+                apply(session.state, Event(op, 0, args))
+            except (ValueError, IndexError):
+                state = session.state
+                return RESPONSE.pack(
+                    ILLEGAL, session_id, len(state.available_pieces), state.has_won
+                )
+        state = session.state
+        return RESPONSE.pack(OK, session_id, len(state.available_pieces), state.has_won)
+
+    def evict_idle(self, now):
+        """Drop the sessions idle for longer than the timeout; returns how many"""
+        sessions = self.sessions
+        cutoff = now - self.idle_timeout
+        count = 0
+        # Oldest first, so stop at the first one still in use
+        while sessions:
+            session_id, session = next(iter(sessions.items()))
+            if session.last_seen > cutoff:
+                break
+            del sessions[session_id]
+            count += 1
+        self.evicted += count
+        return count
+
+    async def evict_loop(self):
+        """Evict idle sessions a few times per timeout period"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_timeout / 4))
+            self.evict_idle(loop.time())
+
+
+class ServerProtocol(asyncio.Protocol):
+    """Splits a connection's byte stream into frames and answers them in one write"""
+
+    def __init__(self, server):
+        self.server = server
+        self.buffer = bytearray()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        handle = self.server.handle
+        now = asyncio.get_running_loop().time()
+        out = bytearray()
+        pos = 0
+        size = len(buffer)
+        header = REQUEST.size
+        while pos + header <= size:
+            op, session_id = REQUEST.unpack_from(buffer, pos)
+            payload = PAYLOAD_SIZE.get(op)
+            if payload is None:
+                # Can't find the next frame after an unknown opcode
+                out += RESPONSE.pack(BAD_REQUEST, session_id, 0, 0)
+                self.transport.write(bytes(out))
+                self.transport.close()
+                return
+            end = pos + header + payload
+            if end > size:
+                break
+            out += handle(op, session_id, tuple(buffer[pos + header : end]), now)
+            pos = end
+        del buffer[:pos]
+        if out:
+            self.transport.write(bytes(out))
+
+
+async def start(server, address):
+    """Start listening on ("unix", path) or ("tcp", (host, port))"""
+    loop = asyncio.get_running_loop()
+    kind, where = address
+    if kind == "unix":
+        if os.path.exists(where):
+            os.unlink(where)
+        return await loop.create_unix_server(lambda: ServerProtocol(server), where)
+    host, port = where
+    return await loop.create_server(lambda: ServerProtocol(server), host, port)
+
+
+async def serve(address, puzzle_name=None, idle_timeout=300.0, max_sessions=100_000):
+    """Run a server until cancelled"""
+    server = SessionServer(get_puzzle(puzzle_name), idle_timeout, max_sessions)
+    listener = await start(server, address)
+    evictor = asyncio.create_task(server.evict_loop())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        evictor.cancel()
+
+
+def _serve_process(address, puzzle_name, idle_timeout, max_sessions):
+    try:
+        asyncio.run(serve(address, puzzle_name, idle_timeout, max_sessions))
+    except KeyboardInterrupt:
+        pass
+
+
+class ClientProtocol(asyncio.Protocol):
+    """Client side of a connection; replies resolve futures in request order"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.pending = deque()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def send(self, op, session=0, args=()):
+        """Send a request and get a future for its (status, session, left, won) reply"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.transport.write(request(op, session, args))
+        return future
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        size = RESPONSE.size
+        count = len(buffer) // size
+        for index in range(count):
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_result(RESPONSE.unpack_from(buffer, index * size))
+        del buffer[: count * size]
+
+    def connection_lost(self, exc):
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError("server closed the connection"))
+
+
+async def connect(address):
+    """Open a client connection and return its protocol"""
+    loop = asyncio.get_running_loop()
+    kind, where = address
+    if kind == "unix":
+        _, protocol = await loop.create_unix_connection(ClientProtocol, where)
+    else:
+        _, protocol = await loop.create_connection(ClientProtocol, *where)
+    return protocol
+
+
+async def _drive(connection, puzzle, deadline, rng, latencies, statuses):
+    """Play one session with random commands until the deadline"""
+    status, session, left, won = await connection.send(OPEN)
+    clock = time.perf_counter
+    while clock() < deadline:
+        roll = rng.random()
+        if won or roll < 0.02:
+            op, args = RESET, ()
+        elif roll < 0.06:
+            op, args = UNDO, ()
+        elif roll < 0.08:
+            op, args = REDO, ()
+        elif left == 0:
+            op, args = UNDO, ()
+        elif roll < 0.30:
+            op, args = ROTATE, (rng.randrange(left),)
+        elif roll < 0.40:
+            op, args = SELECT, (rng.randrange(left),)
+        else:
+            op, args = PLACE, (
+                rng.randrange(left),
+                rng.randrange(puzzle.height),
+                rng.randrange(puzzle.width),
+            )
+        start = clock()
+        status, _, left, won = await connection.send(op, session, args)
+        latencies.append(clock() - start)
+        statuses[status] += 1
+    await connection.send(CLOSE, session)
+
+
+async def run_load(
+    address, sessions=2000, connections=8, duration=10.0, puzzle_name=None, seed=1234
+):
+    """Drive sessions against a server; returns (commands, elapsed, latencies, statuses)"""
+    puzzle = get_puzzle(puzzle_name)
+    links = [await connect(address) for _ in range(connections)]
+    rng = random.Random(seed)
+    latencies = []
+    statuses = [0] * len(STATUS_NAMES)
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *(
+            _drive(
+                links[index % connections],
+                puzzle,
+                deadline,
+                random.Random(rng.random()),
+                latencies,
+                statuses,
+            )
+            for index in range(sessions)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    for link in links:
+        link.transport.close()
+    return len(latencies), elapsed, latencies, statuses
+
+
+def percentile(sorted_values, fraction):
+    """Get a percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[
+        min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    ]
+
+
+def report(commands, elapsed, latencies, statuses, file=sys.stdout):
+    """Print throughput and latency percentiles of a load run"""
+    latencies = sorted(latencies)
+    print(
+        f"{commands:,} commands in {elapsed:.2f}s: {commands / elapsed:,.0f} cmd/s",
+        file=file,
+    )
+    print(
+        "latency ms  "
+        + "  ".join(
+            f"p{label} {percentile(latencies, fraction) * 1000:.2f}"
+            for label, fraction in (
+                ("50", 0.50),
+                ("90", 0.90),
+                ("99", 0.99),
+                ("100", 1.0),
+            )
+        ),
+        file=file,
+    )
+    print(
+        "replies     "
+        + "  ".join(
+            f"{name} {count:,}" for name, count in zip(STATUS_NAMES, statuses) if count
+        ),
+        file=file,
+    )
+
+
+async def _wait_until_listening(address, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            link = await connect(address)
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+        else:
+            link.transport.close()
+            return
+
+
+def load(args, address):
+    """Run the load generator, starting a server process unless --external"""
+    server = None
+    if not args.external:
+        server = multiprocessing.Process(
+            target=_serve_process,
+            args=(address, args.puzzle, args.idle_timeout, args.max_sessions),
+            daemon=True,
+        )
+        server.start()
+    try:
+
+        async def main():
+            await _wait_until_listening(address)
+            return await run_load(
+                address, args.sessions, args.connections, args.duration, args.puzzle
+            )
+
+        report(*asyncio.run(main()))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+    return 0
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Host many headless game sessions")
+    parser.add_argument(
+        "mode",
+        choices=("serve", "load"),
+        help="run a server, or drive one with generated load",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--unix", metavar="PATH", help="listen on a Unix socket instead of TCP"
+    )
+    parser.add_argument("--puzzle", help="puzzle for every session (default: classic)")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=300.0,
+        help="seconds before an unused session is dropped",
+    )
+    parser.add_argument("--max-sessions", type=int, default=100_000)
+    parser.add_argument(
+        "--sessions", type=int, default=2000, help="load: concurrent sessions"
+    )
+    parser.add_argument(
+        "--connections", type=int, default=8, help="load: client sockets"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="load: seconds to run"
+    )
+    parser.add_argument(
+        "--external",
+        action="store_true",
+        help="load: use a server that is already running",
+    )
+    args = parser.parse_args()
+
+    address = ("unix", args.unix) if args.unix else ("tcp", (args.host, args.port))
+    if args.mode == "load":
+        return load(args, address)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(
+        f"serving {get_puzzle(args.puzzle).name} sessions on {where}", file=sys.stderr
+    )
+    try:
+        asyncio.run(serve(address, args.puzzle, args.idle_timeout, args.max_sessions))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
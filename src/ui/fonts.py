@@ -0,0 +1,9 @@
+from functools import lru_cache
+
+import pygame
+
+
+@lru_cache(maxsize=None)
+def get_font(size, name=None):
+    """Load a font the first time it is asked for and reuse it for the whole process"""
+    return pygame.font.Font(name, size)
@@ -1,15 +1,86 @@
 import pygame
 from ..models.board import Board
-from ..utils.constants import (
-    TITLE_HEIGHT, WINDOW_HEIGHT, WINDOW_WIDTH,
-    PADDING, CELL_SIZE
-)
+from ..models.move_log import NULL_RECORDER
+from ..utils.constants import FPS
 
 class Game:
-    def __init__(self):
+    def __init__(self, fps=FPS, idle=True, profiler=None, puzzle=None, hints=True,
+                 recorder=None, startup=None, solutions=None):
         """Initialize the game"""
-        self.board = Board(initialize_pygame=True)
+        self.board = Board(initialize_pygame=True, puzzle=puzzle)
         self.running = True
+        self.fps = fps
+        # Block on events instead of polling while nothing is moving
+        self.idle = idle
+        self.needs_redraw = True
+        self.clock = pygame.time.Clock()
+        # Optional frame instrumentation (see ui/instrumentation.py)
+        if profiler is not None:
+            self.board.profiler = profiler
+        self.profiler = self.board.profiler
+        # Optional move log (see models/move_log.py)
+        self.recorder = recorder if recorder is not None else NULL_RECORDER
+        # Background solver for hints and the solvability indicator, started
+        # after the first frame so it doesn't delay it
+        self.hints = None
+        self.board.hints_enabled = hints
+        # Optional precomputed solutions that answer hints without solving
+        # (see models/solution_db.py)
+        self.solutions = solutions
+        # Optional startup phase timings, reported after the first frame
+        self.startup = startup
+        self.frames = 0
+        self.quit_after_first_frame = False
+
+    def start_hints(self):
+        """Start the hint worker and give it the current board"""
+        if self.solutions is not None:
+            from ..models.solution_db import DatabaseHints
+            self.hints = DatabaseHints(self.solutions)
+        else:
+            from ..models.hint_worker import HintWorker
+            self.hints = HintWorker(self.board.puzzle)
+        self.request_hint()
+
+    def request_hint(self):
+        """Forget the current hint and ask the worker about the new board"""
+        if self.hints is not None:
+            self.board.solvable = None
+            self.board.hint = None
+            self.hints.submit(self.board)
+
+    def poll_hint(self):
+        """Pick up a finished solve, if any"""
+        result = self.hints.poll()
+        if result is not None:
+            self.board.solvable, self.board.hint = result
+            self.needs_redraw = True
+
+    def handle_key_down(self, event):
+        """Handle key presses"""
+        # F3 toggles the frame timing overlay
+        if event.key == pygame.K_F3 and self.profiler.enabled:
+            self.profiler.toggle_overlay()
+            self.board.invalidate()
+            self.needs_redraw = True
+        # Ctrl+Z undoes a move, Ctrl+Y or Ctrl+Shift+Z redoes it
+        elif event.key in (pygame.K_z, pygame.K_y) and event.mod & pygame.KMOD_CTRL:
+            if event.key == pygame.K_y or event.mod & pygame.KMOD_SHIFT:
+                self.step_history(self.board.redo, self.recorder.redo)
+            else:
+                self.step_history(self.board.undo, self.recorder.undo)
+        # H shows or hides the suggested move
+        elif event.key == pygame.K_h and self.hints is not None:
+            self.board.show_hint = not self.board.show_hint
+            self.needs_redraw = True
+
+    def step_history(self, move, record):
+        """Undo or redo a move unless a drag is in progress"""
+        if not self.board.dragging and move():
+            record()
+            self.board.target_scroll = min(self.board.target_scroll, self.board.scroll_limit())
+            self.request_hint()
+            self.needs_redraw = True
 
     def handle_mouse_button_down(self, event):
         """Handle mouse button down events"""
@@ -23,6 +94,8 @@ class Game:
                 self.board.has_won = False
                 self.board.scroll_offset = 0  # Reset scroll
                 self.board.target_scroll = 0  # Reset scroll target
+                self.recorder.reset()
+                self.request_hint()
                 return
             
             # Only allow piece selection if game isn't won
@@ -30,13 +103,15 @@ class Game:
                 # Try to select a piece from the selection area
                 piece = self.board.get_piece_at_position(mouse_x, mouse_y)
                 if piece:
+                    self.recorder.select(self.board.available_pieces.index(piece))
                     self.board.selected_piece = piece
                     self.board.dragging = True
                     self.board.drag_pos = (mouse_x, mouse_y)
         
         # Right click (rotate piece)
         elif event.button == 3 and self.board.selected_piece:
-            self.board.selected_piece.rotate()
+            self.recorder.rotate(self.board.available_pieces.index(self.board.selected_piece))
+            self.board.rotate_piece(self.board.selected_piece)
 
     def handle_mouse_motion(self, event):
         """Handle mouse motion events"""
@@ -44,11 +119,15 @@ class Game:
         
         # Update reset button hover state
         if self.board.reset_button_rect:
-            self.board.reset_hover = self.board.reset_button_rect.collidepoint(mouse_x, mouse_y)
+            hover = bool(self.board.reset_button_rect.collidepoint(mouse_x, mouse_y))
+            if hover != self.board.reset_hover:
+                self.board.reset_hover = hover
+                self.needs_redraw = True
         
         # Update dragged piece position
         if self.board.dragging:
             self.board.drag_pos = (mouse_x, mouse_y)
+            self.needs_redraw = True
 
     def handle_mouse_button_up(self, event):
         """Handle mouse button up events"""
@@ -56,23 +135,24 @@ class Game:
             mouse_x, mouse_y = pygame.mouse.get_pos()
             
             # Check if piece is being dropped on the board
-            if TITLE_HEIGHT <= mouse_y < WINDOW_HEIGHT + TITLE_HEIGHT:
-                adjusted_x = mouse_x - (self.board.selected_piece.width * CELL_SIZE) // 2
-                adjusted_y = mouse_y - (self.board.selected_piece.height * CELL_SIZE) // 2
+            layout = self.board.layout
+            if layout.title_height <= mouse_y < layout.strip_top:
+                adjusted_x = mouse_x - (self.board.selected_piece.width * layout.cell_size) // 2
+                adjusted_y = mouse_y - (self.board.selected_piece.height * layout.cell_size) // 2
                 
-                # Place piece if position is valid
-                if self.board.is_valid_position(self.board.selected_piece, adjusted_x, adjusted_y):
-                    self.board.place_piece(self.board.selected_piece, adjusted_x, adjusted_y)
-                    self.board.available_pieces.remove(self.board.selected_piece)
+                # Place piece at the nearest legal cell, if one is close enough
+                snapped = self.board.snap_position(self.board.selected_piece, adjusted_x, adjusted_y)
+                if snapped is not None:
+                    self.recorder.place(self.board.available_pieces.index(self.board.selected_piece),
+                                        *snapped)
+                    # Place it, take it out of the selection area and check for a win
+                    self.board.play(self.board.selected_piece, *snapped)
                     
                     # Adjust scroll position to show remaining pieces
-                    total_width = sum((piece.width + 1) * CELL_SIZE for piece in self.board.available_pieces) - CELL_SIZE
-                    max_scroll = max(0, total_width - WINDOW_WIDTH + 2 * PADDING)
-                    self.board.target_scroll = min(self.board.scroll_offset, max_scroll)
+                    self.board.target_scroll = min(self.board.scroll_offset, self.board.scroll_limit())
                     
-                    # Check for win after placing piece
-                    if self.board.check_win():
-                        self.board.has_won = True
+                    # Solve the new board in the background
+                    self.request_hint()
             
             # Reset drag state
             self.board.dragging = False
@@ -86,28 +166,85 @@ class Game:
             elif event.button == 5:  # Scroll down
                 self.board.cycle_piece_backward()
 
+    def is_scrolling(self):
+        """Check if the selection strip is still sliding to its target"""
+        return self.board.scroll_offset != self.board.target_scroll
+
+    def is_animating(self):
+        """Check if input, scrolling or a solve result can arrive at frame rate"""
+        return (self.board.dragging or self.is_scrolling() or
+                (self.hints is not None and self.hints.pending))
+
     def run(self):
         """Main game loop"""
-        while self.running:
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button in (1, 3):  # Left or right click
-                        self.handle_mouse_button_down(event)
-                    elif event.button in (4, 5):  # Mouse wheel up/down
-                        self.handle_mouse_wheel(event)
-                
-                elif event.type == pygame.MOUSEMOTION:
-                    self.handle_mouse_motion(event)
+        profiler = self.profiler
+        try:
+            while self.running:
+                if self.idle and not self.needs_redraw and not self.is_animating():
+                    # Nothing to draw until something happens: sleep on the queue
+                    events = [pygame.event.wait()] + pygame.event.get()
+                else:
+                    events = pygame.event.get()
+
+                profiler.begin_frame()
+                with profiler.section("events"):
+                    self.handle_events(events)
+                    if self.hints is not None:
+                        self.poll_hint()
                 
-                elif event.type == pygame.MOUSEBUTTONUP:
-                    self.handle_mouse_button_up(event)
-            
-            # Update display
-            self.board.display()
+                # Update display only when something changed
+                if self.needs_redraw or self.is_scrolling() or not self.idle:
+                    self.needs_redraw = False
+                    self.board.display()
+                    self.frames += 1
+                    if self.frames == 1:
+                        self.first_frame_done()
+                profiler.end_frame()
+
+                # Cap the frame rate
+                self.clock.tick(self.fps)
+        finally:
+            profiler.close()
+            self.recorder.close()
+            if self.hints is not None:
+                self.hints.close()
         
         # Clean up
         pygame.quit()
+
+    def first_frame_done(self):
+        """Report startup timings and start the deferred background work"""
+        if self.startup is not None:
+            self.startup.mark("first frame")
+            self.startup.report()
+        if self.quit_after_first_frame:
+            self.running = False
+            return
+        if self.board.hints_enabled and self.hints is None:
+            self.start_hints()
+
+    def handle_events(self, events):
+        """Dispatch a batch of pygame events"""
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.running = False
+            
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self.needs_redraw = True
+                if event.button in (1, 3):  # Left or right click
+                    self.handle_mouse_button_down(event)
+                elif event.button in (4, 5):  # Mouse wheel up/down
+                    self.handle_mouse_wheel(event)
+            
+            elif event.type == pygame.MOUSEMOTION:
+                self.handle_mouse_motion(event)
+            
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.needs_redraw = True
+                self.handle_mouse_button_up(event)
+
+            elif event.type == pygame.KEYDOWN:
+                self.handle_key_down(event)
+
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self.needs_redraw = True
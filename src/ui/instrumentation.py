@@ -0,0 +1,228 @@
+import time
+from collections import deque
+
+# Parts of a frame, in the order they happen
+SECTIONS = (
+    "events",
+    "background",
+    "button",
+    "strip",
+    "hint",
+    "drag",
+    "win",
+    "hud",
+    "update",
+)
+
+HUD_COLOR = (255, 255, 255)
+HUD_BACKGROUND = (0, 0, 0, 180)
+
+
+class _NullSection:
+    """Context manager that does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class NullProfiler:
+    """Profiler used when instrumentation is off; every call is a no-op"""
+
+    enabled = False
+    overlay_visible = False
+
+    def section(self, name):
+        return _NULL_SECTION
+
+    def begin_frame(self):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def toggle_overlay(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Section:
+    """Times one part of the current frame"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = (
+            current.get(self.name, 0.0) + time.perf_counter() - self.start
+        )
+        return False
+
+
+class FrameProfiler:
+    """Times each part of every frame and keeps rolling percentiles
+
+    Per-frame records can be written to a CSV file, and cProfile can be
+    run over the first few frames.
+    """
+
+    enabled = True
+
+    def __init__(
+        self, window=240, csv_path=None, cprofile_frames=0, cprofile_path="frames.prof"
+    ):
+        self.window = window
+        self.history = {name: deque(maxlen=window) for name in SECTIONS + ("frame",)}
+        self.sections = {name: _Section(self, name) for name in SECTIONS}
+        self.current = {}
+        self.frame = 0
+        self.frame_start = 0.0
+        self.overlay_visible = False
+        self._hud_font = None
+        self._hud_lines = []
+
+        # Per-frame CSV records
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            # Imported here so the no-op profiler doesn't load them on every launch
+            import csv
+
+            self._csv_file = open(csv_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(
+                ("frame", "frame_ms") + tuple(f"{name}_ms" for name in SECTIONS)
+            )
+
+        # cProfile capture for the first N frames
+        self.cprofile_frames = cprofile_frames
+        self.cprofile_path = cprofile_path
+        self._cprofile = None
+        if cprofile_frames:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+
+    def section(self, name):
+        """Get the context manager that times a part of the frame"""
+        return self.sections[name]
+
+    def begin_frame(self):
+        """Start timing a frame"""
+        self.current = {}
+        if self._cprofile is not None and self.frame == 0:
+            self._cprofile.enable()
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Finish the frame and record its timings"""
+        total = time.perf_counter() - self.frame_start
+        self.history["frame"].append(total)
+        for name in SECTIONS:
+            self.history[name].append(self.current.get(name, 0.0))
+        if self._csv is not None:
+            self._csv.writerow(
+                [self.frame, f"{total * 1000:.4f}"]
+                + [f"{self.current.get(name, 0.0) * 1000:.4f}" for name in SECTIONS]
+            )
+        self.frame += 1
+
+        if self._cprofile is not None and self.frame >= self.cprofile_frames:
+            self._finish_cprofile()
+
+    def _finish_cprofile(self):
+        """Stop cProfile, save the stats and print the top functions"""
+        import pstats
+
+        self._cprofile.disable()
+        self._cprofile.dump_stats(self.cprofile_path)
+        print(f"cProfile over {self.frame} frames saved to {self.cprofile_path}")
+        pstats.Stats(self._cprofile).sort_stats("cumulative").print_stats(20)
+        self._cprofile = None
+
+    def percentiles(self, name, points=(50, 95, 99)):
+        """Get rolling percentiles of a section in milliseconds"""
+        samples = sorted(self.history[name])
+        if not samples:
+            return tuple(0.0 for _ in points)
+        last = len(samples) - 1
+        return tuple(
+            samples[min(last, round(last * point / 100))] * 1000 for point in points
+        )
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    def draw_overlay(self, screen):
+        """Draw the percentile table in the top-left corner and return its area"""
+        import pygame
+
+        if self._hud_font is None:
+            self._hud_font = pygame.font.SysFont("monospace", 14)
+        # Refresh the text a few times a second rather than every frame
+        if not self._hud_lines or self.frame % 15 == 0:
+            self._hud_lines = [
+                self._hud_font.render(
+                    f"{'ms':10s}   p50    p95    p99", True, HUD_COLOR
+                )
+            ]
+            for name in ("frame",) + SECTIONS:
+                p50, p95, p99 = self.percentiles(name)
+                self._hud_lines.append(
+                    self._hud_font.render(
+                        f"{name:10s} {p50:6.2f} {p95:6.2f} {p99:6.2f}", True, HUD_COLOR
+                    )
+                )
+
+        line_height = self._hud_font.get_linesize()
+        width = max(line.get_width() for line in self._hud_lines) + 8
+        height = line_height * len(self._hud_lines) + 8
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(HUD_BACKGROUND)
+        for index, line in enumerate(self._hud_lines):
+            panel.blit(line, (4, 4 + index * line_height))
+        return screen.blit(panel, (0, 0))
+
+    def close(self):
+        """Flush the CSV file and any unfinished cProfile capture"""
+        if self._cprofile is not None:
+            self._finish_cprofile()
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
+
+
+class StartupTimer:
+    """Times the phases between process start and the first frame"""
+
+    def __init__(self, start=None):
+        self.marks = [("start", start if start is not None else time.perf_counter())]
+
+    def mark(self, phase):
+        """Record the end of a startup phase"""
+        self.marks.append((phase, time.perf_counter()))
+
+    def report(self, file=None):
+        """Print how long each phase took and the total"""
+        for (_, before), (phase, after) in zip(self.marks, self.marks[1:]):
+            print(f"startup {phase:12s} {(after - before) * 1000:8.1f} ms", file=file)
+        total = self.marks[-1][1] - self.marks[0][1]
+        print(f"startup {'total':12s} {total * 1000:8.1f} ms", file=file)
@@ -0,0 +1,160 @@
+import pygame
+
+from ..models.piece import KINDS
+from ..utils.constants import (
+    BG_COLOR,
+    BUTTON_COLOR,
+    BUTTON_HOVER_COLOR,
+    BUTTON_PADDING,
+    BUTTON_RADIUS,
+    EMPTY_COLOR,
+    GRID_COLOR,
+)
+from .fonts import get_font
+
+STRIP_COLOR = (40, 40, 40)
+TEXT_COLOR = (255, 255, 255)
+HINT_COLOR = (255, 255, 0)
+# Opacity of strip pieces that fit nowhere on the board
+DISABLED_ALPHA = 60
+# Solvability indicator: unknown (still solving), solvable, stuck
+STATUS_COLORS = {None: (120, 120, 120), True: (0, 200, 0), False: (220, 0, 0)}
+STATUS_RADIUS = 8
+
+# Font sizes
+TITLE_FONT_SIZE = 60
+BUTTON_FONT_SIZE = 36
+WIN_FONT_SIZE = 74
+
+
+def draw_cells(surface, grid, cell_rect):
+    """Draw board cells with their grid lines; cell_rect maps (row, col) to a rect"""
+    for row in range(len(grid)):
+        for col in range(len(grid[0])):
+            cell = grid[row][col]
+            if cell is None:
+                continue
+            rect = cell_rect(row, col)
+            surface.fill(cell if cell != 0 else EMPTY_COLOR, rect)
+            pygame.draw.rect(surface, GRID_COLOR, rect, 1)
+
+
+class RenderCache:
+    """Pre-rendered surfaces reused by Board.display between frames"""
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.screen_size = layout.screen_size
+        window_width = layout.window_width
+
+        # Static text
+        self.title_surface = get_font(TITLE_FONT_SIZE).render(
+            "TETRIS", True, TEXT_COLOR
+        )
+        self.title_rect = self.title_surface.get_rect(
+            center=(window_width // 2, layout.title_height // 2)
+        )
+
+        # Reset button in both hover states, text already centred
+        text = get_font(BUTTON_FONT_SIZE).render("Reset", True, TEXT_COLOR)
+        text_rect = text.get_rect()
+        self.button_rect = pygame.Rect(
+            window_width - text_rect.width - BUTTON_PADDING * 3,
+            BUTTON_PADDING,
+            text_rect.width + BUTTON_PADDING * 2,
+            text_rect.height + BUTTON_PADDING,
+        )
+        self.button_surfaces = {}
+        for hover, color in ((False, BUTTON_COLOR), (True, BUTTON_HOVER_COLOR)):
+            surface = pygame.Surface(self.button_rect.size, pygame.SRCALPHA)
+            pygame.draw.rect(
+                surface, color, surface.get_rect(), border_radius=BUTTON_RADIUS
+            )
+            text_rect.center = surface.get_rect().center
+            surface.blit(text, text_rect)
+            self.button_surfaces[hover] = surface
+
+        # Solvability indicator dot, left of the title
+        self.status_surfaces = {}
+        for status, color in STATUS_COLORS.items():
+            surface = pygame.Surface(
+                (STATUS_RADIUS * 2, STATUS_RADIUS * 2), pygame.SRCALPHA
+            )
+            pygame.draw.circle(
+                surface, color, (STATUS_RADIUS, STATUS_RADIUS), STATUS_RADIUS
+            )
+            self.status_surfaces[status] = surface
+        self.status_rect = pygame.Rect(0, 0, STATUS_RADIUS * 2, STATUS_RADIUS * 2)
+        self.status_rect.center = (layout.padding, layout.title_height // 2)
+
+        self._background = None
+        self._background_version = None
+        self._sprites = {}
+        self._win = None
+
+    def win_message(self):
+        """Get the (overlay, text, text rect) shown on a win, built on the first win"""
+        if self._win is None:
+            # Win overlay: dimmed window with the message on top
+            overlay = pygame.Surface(self.screen_size)
+            overlay.fill((0, 0, 0))
+            overlay.set_alpha(128)
+            text = get_font(WIN_FONT_SIZE).render("Puzzle Complete!", True, TEXT_COLOR)
+            rect = text.get_rect(
+                center=(self.layout.window_width // 2, self.layout.strip_top // 2)
+            )
+            self._win = (overlay, text, rect)
+        return self._win
+
+    def background(self, grid, version):
+        """Get the window without any moving parts, redrawn when the grid changes"""
+        if self._background is None or version != self._background_version:
+            if self._background is None:
+                self._background = pygame.Surface(self.screen_size).convert()
+            surface = self._background
+            surface.fill(BG_COLOR)
+            surface.blit(self.title_surface, self.title_rect)
+
+            draw_cells(surface, grid, self.layout.cell_rect)
+
+            # Selection area
+            surface.fill(STRIP_COLOR, self.strip_rect())
+            pygame.draw.line(
+                surface,
+                GRID_COLOR,
+                (0, self.layout.strip_top),
+                (self.layout.window_width, self.layout.strip_top),
+                2,
+            )
+            self._background_version = version
+        return self._background
+
+    def piece_sprite(self, kind, orientation, dragged=False, disabled=False):
+        """Get a piece drawn in one orientation, opaque, semi-transparent or faded out"""
+        key = (kind, orientation, dragged, disabled)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            shape = KINDS[kind].orientations[orientation]
+            color = KINDS[kind].color
+            cell_size = self.layout.cell_size
+            sprite = pygame.Surface(
+                (shape.width * cell_size, shape.height * cell_size), pygame.SRCALPHA
+            )
+            for row, col in shape.cells:
+                rect = (col * cell_size, row * cell_size, cell_size, cell_size)
+                if dragged:
+                    sprite.fill((*color, 128), rect)
+                elif disabled:
+                    sprite.fill((*color, DISABLED_ALPHA), rect)
+                    pygame.draw.rect(sprite, GRID_COLOR, rect, 1)
+                else:
+                    sprite.fill(color, rect)
+                    pygame.draw.rect(sprite, GRID_COLOR, rect, 1)
+            self._sprites[key] = sprite
+        return sprite
+
+    def strip_rect(self):
+        layout = self.layout
+        return pygame.Rect(
+            0, layout.strip_top, layout.window_width, layout.selection_height
+        )
@@ -8,6 +8,18 @@ TITLE_HEIGHT = 80
 PADDING = 100
 BOTTOM_PADDING = 40
 
+# Frame rate cap for the game loop (0 means uncapped)
+FPS = 60
+
+# Undo history length, in moves
+HISTORY_LIMIT = 1000
+
+# Boards whose legal moves are remembered per puzzle, for undo and redo
+LEGAL_MOVES_CACHE = 256
+
+# How far a dropped piece may jump to the nearest legal cell, in cells
+SNAP_DISTANCE = 0.75
+
 # Button styling
 BUTTON_PADDING = 20
 BUTTON_RADIUS = 5
@@ -18,6 +30,13 @@ BUTTON_HOVER_COLOR = (220, 70, 70)
 BOARD_WIDTH = 5
 BOARD_HEIGHT = 6
 
+# Cells cut out of the board as (row, col)
+MISSING_CELLS = ((0, 0), (0, BOARD_WIDTH - 1))
+
+# Largest board in pixels; bigger boards get cells smaller than CELL_SIZE
+MAX_BOARD_PIXEL_WIDTH = 600
+MAX_BOARD_PIXEL_HEIGHT = 480
+
 # Calculate window dimensions
 BOARD_PIXEL_WIDTH = BOARD_WIDTH * CELL_SIZE
 BOARD_PIXEL_HEIGHT = BOARD_HEIGHT * CELL_SIZE
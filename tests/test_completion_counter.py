@@ -0,0 +1,80 @@
+"""Symmetry-reduced completion counts agree with the direct search"""
+
+import pytest
+
+from src.models.puzzle import get_puzzle
+from src.models.solver import CompletionCounter, Solver, completion_counter
+from src.models.symmetry import Symmetry
+
+
+def partial_boards(puzzle, solutions, pieces_left):
+    """Get (occupied, remaining kinds) after each prefix of the first solutions"""
+    boards = []
+    solver = Solver(puzzle.new_grid(), puzzle.create_pieces())
+    for number, solution in enumerate(solver.solutions()):
+        if number == solutions:
+            break
+        for moves in range(len(solution) - pieces_left, len(solution) + 1):
+            occupied = 0
+            used = set()
+            for placement in solution[:moves]:
+                occupied |= placement.mask
+                used.add(placement.piece)
+            kinds = [
+                kind for index, kind in enumerate(puzzle.kinds) if index not in used
+            ]
+            boards.append((occupied, kinds))
+    return boards
+
+
+def board_symmetry(puzzle):
+    return Symmetry(
+        puzzle.playable, puzzle.width, puzzle.height, tuple(sorted(puzzle.kinds))
+    )
+
+
+@pytest.mark.parametrize(
+    "name, solutions, pieces_left",
+    [
+        ("classic", 20, 7),
+        ("pentomino_6x10", 10, 4),
+        ("pentomino_8x8", 10, 4),
+    ],
+)
+def test_reduced_count_matches_direct_count(name, solutions, pieces_left):
+    puzzle = get_puzzle(name)
+    reduced = CompletionCounter(
+        puzzle.playable, puzzle.width, puzzle.height, symmetry=board_symmetry(puzzle)
+    )
+    direct = CompletionCounter(puzzle.playable, puzzle.width, puzzle.height)
+
+    for occupied, kinds in partial_boards(puzzle, solutions, pieces_left):
+        assert reduced.count(occupied, kinds) == direct.count(occupied, kinds)
+
+
+@pytest.mark.parametrize(
+    "name, reduced",
+    [
+        ("classic", False),
+        ("pentomino_6x10", True),
+        ("pentomino_8x8", True),
+    ],
+)
+def test_shared_counter_reduces_large_boards_only(name, reduced):
+    puzzle = get_puzzle(name)
+    counter = completion_counter(
+        puzzle.playable, puzzle.width, puzzle.height, tuple(sorted(puzzle.kinds))
+    )
+    assert (counter.symmetry is not None) == reduced
+
+
+def test_symmetric_boards_share_an_entry():
+    puzzle = get_puzzle("classic")
+    symmetry = board_symmetry(puzzle)
+    assert symmetry.order > 1
+    for occupied, kinds in partial_boards(puzzle, 20, 7):
+        key = symmetry.canonical_state(occupied, kinds)
+        for index, transform in enumerate(symmetry.transforms):
+            image = symmetry.transform(index, occupied)
+            image_kinds = [transform.kinds[kind] for kind in kinds]
+            assert symmetry.canonical_state(image, image_kinds) == key
@@ -0,0 +1,80 @@
+"""Puzzle pack generation and resuming an interrupted run"""
+
+import argparse
+import json
+
+from src.models.puzzle import Puzzle, get_puzzle
+from src.models.solver import Solver
+from src.tools import generate
+
+
+def options(out, **overrides):
+    values = dict(
+        out=str(out),
+        puzzle="classic",
+        seeds=300,
+        start_seed=0,
+        chunk=100,
+        workers=1,
+        min_pieces=4,
+        checkpoint=None,
+        resume=False,
+    )
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_records_have_one_solution(tmp_path):
+    out = tmp_path / "pack.jsonl"
+    written = generate.generate(options(out))
+    lines = out.read_text().splitlines()
+    assert written == len(lines) > 0
+    for line in lines:
+        record = json.loads(line)
+        puzzle = Puzzle.from_dict(record)
+        solver = Solver(puzzle.new_grid(), puzzle.create_pieces())
+        assert solver.count(limit=2) == 1
+        assert [list(p[:4]) for p in solver.solve()] == record["solution"]
+
+
+def test_last_chunk_stops_at_seeds():
+    generate._init_worker("classic")
+    base = get_puzzle("classic")
+    _, records = generate.run_chunk(2, 0, 250, 100, 4)
+    seeds = [record["seed"] for record in records]
+    assert seeds and max(seeds) < 250
+    expected = [
+        seed
+        for seed in range(200, 250)
+        if generate.make_variant(seed, base, 4) is not None
+    ]
+    assert seeds == expected
+
+
+def test_resume_finishes_an_interrupted_run(tmp_path):
+    reference = tmp_path / "reference.jsonl"
+    generate.generate(options(reference))
+
+    out = tmp_path / "pack.jsonl"
+    generate.generate(options(out))
+    checkpoint = tmp_path / "pack.jsonl.checkpoint"
+    # Interrupted after the first chunk, partway through writing the second
+    first = checkpoint.read_text().splitlines()[0]
+    checkpoint.write_text(first + "\n")
+    offset = int(first.split()[1])
+    # Stand-in bytes show the finished chunk is kept rather than redone
+    kept = b"#" * (offset - 1) + b"\n"
+    out.write_bytes(kept + b'{"name": "half a li')
+
+    generate.generate(options(out, resume=True))
+    assert out.read_bytes() == kept + reference.read_bytes()[offset:]
+    assert len(checkpoint.read_text().splitlines()) == 3
+
+
+def test_fresh_run_replaces_an_old_checkpoint(tmp_path):
+    out = tmp_path / "pack.jsonl"
+    generate.generate(options(out))
+    before = out.read_bytes()
+    generate.generate(options(out))
+    assert out.read_bytes() == before
+    assert len((tmp_path / "pack.jsonl.checkpoint").read_text().splitlines()) == 3
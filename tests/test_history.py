@@ -0,0 +1,130 @@
+"""Undo/redo timeline and its use by GameState"""
+
+import pytest
+
+from src.models.game_state import GameState
+from src.models.history import History, Snapshot, color_cells
+from src.models.solver import Solver
+from src.utils.constants import HISTORY_LIMIT
+
+
+def play_solution(state, moves=None):
+    """Play the first moves of the board's first solution"""
+    pieces = list(state.available_pieces)
+    for placement in Solver.from_board(state).solve()[:moves]:
+        piece = pieces[placement.piece]
+        piece.orientation = placement.orientation
+        state.play(piece, placement.row, placement.col)
+
+
+def test_undo_and_redo_walk_the_timeline():
+    history = History()
+    for move in range(4):
+        history.push(move)
+    assert history.undo() == 2
+    assert history.undo() == 1
+    assert history.redo() == 2
+    assert history.current == 2
+    assert history.move == 2
+
+
+def test_ends_of_the_timeline():
+    history = History()
+    history.push("start")
+    assert history.undo() is None
+    assert history.redo() is None
+    assert not history.can_undo()
+    assert not history.can_redo()
+
+
+def test_push_after_undo_drops_the_redo_branch():
+    history = History()
+    for move in range(4):
+        history.push(move)
+    history.undo()
+    history.undo()
+    history.push("branch")
+    assert not history.can_redo()
+    assert history.snapshots == [0, 1, "branch"]
+
+
+def test_jump_uses_absolute_move_numbers():
+    history = History()
+    for move in range(5):
+        history.push(move)
+    assert history.jump(1) == 1
+    assert history.redo() == 2
+    with pytest.raises(IndexError):
+        history.jump(5)
+
+
+def test_trims_the_oldest_moves_past_the_limit():
+    history = History(maxlen=8)
+    for move in range(20):
+        history.push(move)
+        assert len(history) <= 8
+    assert history.current == 19
+    assert history.move == 19
+    # Move numbers stay absolute after trimming
+    assert history.jump(history.base) == history.base
+    with pytest.raises(IndexError):
+        history.jump(history.base - 1)
+
+
+def test_game_keeps_at_most_history_limit_moves():
+    state = GameState()
+    # Each round records two moves: a placement and a reset
+    for _ in range(HISTORY_LIMIT // 2 + 10):
+        play_solution(state, 1)
+        state.reset_board()
+    assert len(state.history) <= HISTORY_LIMIT
+    assert state.history.move > HISTORY_LIMIT
+    assert state.undo()
+    assert state.bits.occupied != 0
+
+
+def test_colour_layer_shares_the_previous_snapshot():
+    state = GameState()
+    play_solution(state, 2)
+    first, second = state.history.snapshots[1:3]
+    assert second.colors[2] is first.colors
+    assert [mask for mask, _ in color_cells(second.colors)] == [
+        second.occupied & ~first.occupied,
+        first.occupied,
+    ]
+
+
+def test_game_undo_redo_restores_boards():
+    state = GameState()
+    play_solution(state)
+    assert state.has_won
+    won = state.snapshot()
+
+    for _ in range(len(state.pieces)):
+        assert state.undo()
+    assert not state.undo()
+    assert state.bits.occupied == 0
+    assert len(state.available_pieces) == len(state.pieces)
+
+    while state.redo():
+        pass
+    assert state.snapshot() == won
+    assert state.check_win()
+
+
+def test_game_jump_to_a_move():
+    state = GameState()
+    play_solution(state)
+    boards = [snapshot.occupied for snapshot in state.history.snapshots]
+    state.jump_to(3)
+    assert state.bits.occupied == boards[3]
+    assert len(state.available_pieces) == len(state.pieces) - 3
+    assert isinstance(state.history.current, Snapshot)
+
+
+def test_new_game_clears_the_history():
+    state = GameState()
+    play_solution(state, 3)
+    state.new_game()
+    assert len(state.history) == 1
+    assert not state.undo()
@@ -0,0 +1,102 @@
+"""Incremental legal moves agree with a brute-force scan of the board"""
+
+import random
+
+import pytest
+
+from src.models.game_state import GameState
+from src.models.piece import KINDS, Piece
+from src.models.puzzle import builtin_puzzles, get_puzzle
+
+
+def brute_force_fits(state, kind, orientation):
+    """Get every (row, col) where an orientation fits, by testing each cell"""
+    piece = Piece(kind=kind, orientation=orientation)
+    free = state.bits.playable & ~state.bits.occupied
+    fits = set()
+    for row in range(state.bits.height):
+        for col in range(state.bits.width):
+            mask = state.bits.placement_mask(piece, row, col)
+            if mask is not None and mask & free == mask:
+                fits.add((row, col))
+    return fits
+
+
+def assert_matches_brute_force(state):
+    for kind in set(state.puzzle.kinds):
+        total = 0
+        for orientation in range(len(KINDS[kind].orientations)):
+            expected = brute_force_fits(state, kind, orientation)
+            total += len(expected)
+            assert set(state.legal.anchors(kind, orientation)) == expected
+            for row in range(-1, state.bits.height + 1):
+                for col in range(-1, state.bits.width + 1):
+                    assert state.legal.fits(kind, orientation, row, col) == (
+                        (row, col) in expected
+                    )
+        assert state.legal.has_moves(kind) == (total > 0)
+
+
+def random_move(state, rng):
+    piece = rng.choice(state.available_pieces)
+    for _ in range(rng.randrange(4)):
+        state.rotate_piece(piece)
+    moves = sorted(brute_force_fits(state, piece.kind, piece.orientation))
+    if moves:
+        state.play(piece, *rng.choice(moves))
+
+
+@pytest.mark.parametrize("name", builtin_puzzles())
+def test_matches_brute_force_through_play_undo_and_redo(name):
+    state = GameState(get_puzzle(name))
+    rng = random.Random(1)
+    for _ in range(120):
+        roll = rng.random()
+        if roll < 0.05:
+            state.reset_board()
+        elif roll < 0.25:
+            state.undo()
+        elif roll < 0.35:
+            state.redo()
+        elif roll < 0.4 and state.history.move > 2:
+            state.jump_to(rng.randrange(state.history.base, state.history.move))
+        elif state.available_pieces:
+            random_move(state, rng)
+        assert_matches_brute_force(state)
+
+
+def test_undo_restores_the_moves_of_the_earlier_board():
+    state = GameState()
+    rng = random.Random(2)
+    before = {
+        kind: [
+            set(state.legal.anchors(kind, o))
+            for o in range(len(KINDS[kind].orientations))
+        ]
+        for kind in set(state.puzzle.kinds)
+    }
+    random_move(state, rng)
+    random_move(state, rng)
+    state.undo()
+    state.undo()
+    for kind, anchors in before.items():
+        for orientation, expected in enumerate(anchors):
+            assert set(state.legal.anchors(kind, orientation)) == expected
+
+
+def test_games_of_a_board_share_their_tables():
+    first = GameState()
+    second = GameState(first.puzzle)
+    assert first.legal.cover is second.legal.cover
+    assert first.legal.seen is second.legal.seen
+    # Sharing the seen table must not leak one game's board into the other
+    random_move(first, random.Random(3))
+    assert_matches_brute_force(second)
+
+
+def test_nearest_snaps_within_the_limit_only():
+    state = GameState()
+    kind = state.available_pieces[0].kind
+    row, col = sorted(state.legal.anchors(kind, 0))[0]
+    assert state.legal.nearest(kind, 0, row + 0.3, col - 0.2, limit=0.75) == (row, col)
+    assert state.legal.nearest(kind, 0, row + 0.3, col - 0.2, limit=0.1) is None
@@ -0,0 +1,138 @@
+"""Move log encoding, decoding and replay"""
+
+import pytest
+
+from src.models import move_log
+from src.models.game_state import GameState
+from src.models.move_log import (
+    PLACE,
+    REDO,
+    RESET,
+    ROTATE,
+    SELECT,
+    UNDO,
+    Event,
+    MoveRecorder,
+    decode,
+    encode,
+    header,
+    read_log,
+    replay,
+)
+from src.models.solver import Solver
+
+EVENTS = [
+    Event(SELECT, 0, (3,)),
+    Event(ROTATE, 127, (3,)),
+    Event(PLACE, 128, (3, 2, 1)),
+    Event(UNDO, 300000, ()),
+    Event(REDO, 5, ()),
+    Event(RESET, 1, ()),
+]
+
+
+def log_bytes(events, puzzle_name="classic"):
+    return header(puzzle_name) + b"".join(encode(*event) for event in events)
+
+
+def solution_events(state):
+    """Get the PLACE events that play the first solution of a board"""
+    events = []
+    pieces = list(state.available_pieces)
+    played = []
+    for placement in Solver.from_board(state).solve():
+        piece = pieces[placement.piece]
+        index = [p for p in pieces if p not in played].index(piece)
+        for _ in range(placement.orientation):
+            events.append(Event(ROTATE, 0, (index,)))
+        events.append(Event(PLACE, 0, (index, placement.row, placement.col)))
+        played.append(piece)
+    return events
+
+
+def test_round_trip():
+    assert decode(log_bytes(EVENTS, "pentomino_6x10")) == ("pentomino_6x10", EVENTS)
+
+
+def test_delays_use_varints():
+    assert len(encode(UNDO, 127)) == 2
+    assert len(encode(UNDO, 128)) == 3
+    assert len(encode(PLACE, 0, (1, 2, 3))) == 5
+
+
+def test_truncated_record_is_dropped():
+    data = log_bytes(EVENTS)
+    last = len(encode(*EVENTS[-1]))
+    # Cut inside the last record, and inside the delay varint of a PLACE
+    assert decode(data[: -last + 1])[1] == EVENTS[:-1]
+    cut = len(log_bytes(EVENTS[:2])) + 2
+    assert decode(data[:cut])[1] == EVENTS[:2]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"TPML",
+        b"TPML\x01\x07\x00clas",
+    ],
+)
+def test_truncated_header_is_a_value_error(data):
+    with pytest.raises(ValueError, match="truncated"):
+        decode(data)
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        decode(b"PK\x03\x04 not a log")
+    with pytest.raises(ValueError):
+        decode(b"TPML\x09\x00\x00")
+
+
+def test_rejects_unknown_opcode():
+    with pytest.raises(ValueError):
+        decode(header("classic") + bytes((len(move_log.PAYLOAD_SIZES), 0)))
+
+
+def test_replay_wins_a_solved_session():
+    events = solution_events(GameState())
+    state = replay(GameState(), events)
+    assert state.has_won
+
+
+def test_replay_starts_from_an_empty_history():
+    events = solution_events(GameState())
+    state = GameState()
+    replay(state, events)
+    # A second session can undo back to its own start but no further
+    second = [index for index, event in enumerate(events) if event.op == PLACE][1]
+    replay(state, events[: second + 1] + [Event(UNDO, 0, ())] * 3)
+    assert state.bits.occupied == 0
+    assert len(state.available_pieces) == len(state.pieces)
+
+
+def test_replay_rejects_a_placement_that_does_not_fit():
+    with pytest.raises(ValueError):
+        replay(GameState(), [Event(PLACE, 0, (0, 10, 10))])
+
+
+def test_recorder_writes_a_readable_log(tmp_path):
+    path = str(tmp_path / "session.tpml")
+    recorder = MoveRecorder(path, "classic", flush_interval=0.01)
+    recorder.select(0)
+    recorder.rotate(0)
+    recorder.place(0, 1, 2)
+    recorder.undo()
+    recorder.redo()
+    recorder.reset()
+    recorder.close()
+
+    name, events = read_log(path)
+    assert name == "classic"
+    assert [(event.op, event.args) for event in events] == [
+        (SELECT, (0,)),
+        (ROTATE, (0,)),
+        (PLACE, (0, 1, 2)),
+        (UNDO, ()),
+        (REDO, ()),
+        (RESET, ()),
+    ]
@@ -0,0 +1,171 @@
+"""Session server frames and replies"""
+
+import asyncio
+
+from src.models.move_log import PLACE, ROTATE, UNDO
+from src.models.solver import Solver
+from src.tools.server import (
+    BAD_REQUEST,
+    CLOSE,
+    ILLEGAL,
+    NO_SESSION,
+    OK,
+    OPEN,
+    RESPONSE,
+    ServerProtocol,
+    SessionServer,
+    connect,
+    request,
+    start,
+)
+
+
+class FakeTransport:
+    """Collects what the protocol writes"""
+
+    def __init__(self):
+        self.written = bytearray()
+        self.closed = False
+
+    def write(self, data):
+        self.written += data
+
+    def close(self):
+        self.closed = True
+
+
+def replies(data):
+    return [
+        RESPONSE.unpack_from(data, pos) for pos in range(0, len(data), RESPONSE.size)
+    ]
+
+
+def feed(protocol, data):
+    """Run data_received inside an event loop, as the server would"""
+
+    async def run():
+        protocol.data_received(data)
+
+    asyncio.run(run())
+
+
+def opened_session(server):
+    status, session, left, won = RESPONSE.unpack(server.handle(OPEN, 0, (), 0.0))
+    assert status == OK
+    return session, left
+
+
+def test_open_and_close():
+    server = SessionServer()
+    session, left = opened_session(server)
+    assert left == len(server.puzzle.kinds)
+    assert RESPONSE.unpack(server.handle(CLOSE, session, (), 1.0))[0] == OK
+    assert RESPONSE.unpack(server.handle(CLOSE, session, (), 2.0))[0] == NO_SESSION
+
+
+def test_unknown_session_gets_no_session():
+    server = SessionServer()
+    status, session, _, _ = RESPONSE.unpack(server.handle(UNDO, 1234, (), 0.0))
+    assert (status, session) == (NO_SESSION, 1234)
+
+
+def test_illegal_moves_get_illegal():
+    server = SessionServer()
+    session, left = opened_session(server)
+    # Off the board, and a piece index past the end of the strip
+    for args in ((0, 10, 10), (left, 0, 0)):
+        status, _, pieces_left, won = RESPONSE.unpack(
+            server.handle(PLACE, session, args, 0.0)
+        )
+        assert (status, pieces_left, won) == (ILLEGAL, left, 0)
+
+
+def test_solution_wins_the_session():
+    server = SessionServer()
+    session, _ = opened_session(server)
+    state = server.sessions[session].state
+    pieces = list(state.available_pieces)
+    for placement in Solver.from_board(state).solve():
+        piece = pieces[placement.piece]
+        index = state.available_pieces.index(piece)
+        for _ in range(placement.orientation):
+            server.handle(ROTATE, session, (index,), 0.0)
+        reply = server.handle(
+            PLACE, session, (index, placement.row, placement.col), 0.0
+        )
+        assert RESPONSE.unpack(reply)[0] == OK
+    assert RESPONSE.unpack(reply)[2:] == (0, 1)
+
+
+def test_idle_and_excess_sessions_are_evicted():
+    server = SessionServer(idle_timeout=10.0, max_sessions=3)
+    first, _ = opened_session(server)
+    for _ in range(3):
+        server.handle(OPEN, 0, (), 5.0)
+    # Opening a fourth dropped the least recently used one
+    assert first not in server.sessions
+    assert len(server.sessions) == 3
+    assert server.evict_idle(14.0) == 0
+    assert server.evict_idle(16.0) == 3
+    assert not server.sessions
+
+
+def test_frames_split_across_reads():
+    server = SessionServer()
+    protocol = ServerProtocol(server)
+    protocol.connection_made(FakeTransport())
+    data = request(OPEN) + request(OPEN) + request(UNDO, 1)
+    # Byte by byte: no reply until a frame is complete
+    for index in range(len(data)):
+        feed(protocol, data[index : index + 1])
+    statuses = [
+        (status, session)
+        for status, session, _, _ in replies(protocol.transport.written)
+    ]
+    assert statuses == [(OK, 1), (OK, 2), (OK, 1)]
+    assert not protocol.buffer
+
+
+def test_payload_bytes_reach_the_game():
+    server = SessionServer()
+    protocol = ServerProtocol(server)
+    protocol.connection_made(FakeTransport())
+    feed(
+        protocol,
+        request(OPEN) + request(PLACE, 1, (0, 10, 10)) + request(PLACE, 1, (0, 10)),
+    )
+    assert [reply[0] for reply in replies(protocol.transport.written)] == [OK, ILLEGAL]
+    # The short PLACE waits for its last byte
+    assert len(protocol.buffer) == 7
+
+
+def test_unknown_opcode_closes_the_connection():
+    server = SessionServer()
+    protocol = ServerProtocol(server)
+    protocol.connection_made(FakeTransport())
+    feed(protocol, request(OPEN) + request(0x7F, 9) + request(OPEN))
+    assert [reply[:2] for reply in replies(protocol.transport.written)] == [
+        (OK, 1),
+        (BAD_REQUEST, 9),
+    ]
+    assert protocol.transport.closed
+
+
+def test_pipelined_commands_over_a_socket(tmp_path):
+    address = ("unix", str(tmp_path / "server.sock"))
+
+    async def run():
+        listener = await start(SessionServer(), address)
+        async with listener:
+            connection = await connect(address)
+            opened = await asyncio.gather(*(connection.send(OPEN) for _ in range(5)))
+            sessions = [session for _, session, _, _ in opened]
+            undone = await asyncio.gather(*(connection.send(UNDO, s) for s in sessions))
+            missing = await connection.send(UNDO, 999)
+            connection.transport.close()
+        return opened, undone, missing
+
+    opened, undone, missing = asyncio.run(run())
+    assert [reply[0] for reply in opened + undone] == [OK] * 10
+    assert len({reply[1] for reply in opened}) == 5
+    assert missing[0] == NO_SESSION
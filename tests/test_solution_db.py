@@ -0,0 +1,108 @@
+"""Solution database files and lookups"""
+
+import random
+
+import pytest
+
+from src.models.game_state import GameState
+from src.models.history import color_cells
+from src.models.piece import KINDS
+from src.models.puzzle import get_puzzle
+from src.models.solution_db import SolutionDB, build, write
+from src.models.solver import Solver
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("db") / "classic.tpsd")
+    write(get_puzzle("classic"), path)
+    database = SolutionDB(path)
+    yield database
+    database.close()
+
+
+def placed(state):
+    return [(color, mask) for mask, color in color_cells(state.colors)]
+
+
+def random_board(rng, moves):
+    """Play up to moves random legal placements on a fresh classic board"""
+    state = GameState()
+    for _ in range(moves):
+        piece = rng.choice(state.available_pieces)
+        orientation = rng.randrange(len(KINDS[piece.kind].orientations))
+        anchors = state.legal.anchors(piece.kind, orientation)
+        if not anchors:
+            continue
+        while piece.orientation != orientation:
+            state.rotate_piece(piece)
+        state.play(piece, *rng.choice(sorted(anchors)))
+    return state
+
+
+def test_round_trip(database):
+    puzzle = get_puzzle("classic")
+    assert len(database) == Solver(puzzle.new_grid(), puzzle.create_pieces()).count()
+    assert database.matches(puzzle)
+    assert not database.matches(get_puzzle("pentomino_6x10"))
+    solutions = {
+        frozenset((p.piece, p.mask) for p in database.solution(index))
+        for index in range(len(database))
+    }
+    expected = {
+        frozenset((p.piece, p.mask) for p in solution)
+        for solution in Solver(puzzle.new_grid(), puzzle.create_pieces()).solutions()
+    }
+    assert solutions == expected
+
+
+def test_build_is_deterministic():
+    puzzle = get_puzzle("classic")
+    assert build(puzzle) == build(puzzle)
+
+
+def test_extending_matches_solver_counts(database):
+    rng = random.Random(5)
+    for moves in range(1, 7):
+        for _ in range(20):
+            state = random_board(rng, moves)
+            found = database.extending(placed(state))
+            assert len(found) == Solver.from_board(state).count()
+
+
+def test_extending_counts_solution_prefixes(database):
+    base = GameState()
+    for solution in Solver.from_board(base).solutions():
+        for moves in range(1, len(solution)):
+            state = GameState(base.puzzle)
+            for placement in solution[:moves]:
+                piece = state.pieces[placement.piece]
+                piece.orientation = placement.orientation
+                state.play(piece, placement.row, placement.col)
+            found = database.extending(placed(state))
+            assert len(found) == Solver.from_board(state).count() > 0
+
+
+def test_empty_board_is_extended_by_everything(database):
+    assert database.extending([]) == list(range(len(database)))
+
+
+def test_hint_leads_to_a_win(database):
+    state = GameState()
+    while state.available_pieces:
+        solvable, hint = database.hint(state)
+        assert solvable
+        index, orientation, row, col = hint
+        piece = state.available_pieces[index]
+        while piece.orientation != orientation:
+            state.rotate_piece(piece)
+        state.play(piece, row, col)
+    assert state.has_won
+    assert database.hint(state) == (True, None)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.tpsd"
+    path.write_bytes(b"not a database, but long enough for a header")
+    with pytest.raises(ValueError):
+        SolutionDB(str(path))
@@ -0,0 +1,92 @@
+"""Exact-cover solver on the stock board"""
+
+import pytest
+
+from src.models.game_state import GameState
+from src.models.solver import Solver
+
+
+def covers_board(state, solution):
+    """Check that a solution uses every piece once and fills every empty cell once"""
+    occupied = 0
+    for placement in solution:
+        if placement.mask & occupied:
+            return False
+        occupied |= placement.mask
+    pieces = sorted(placement.piece for placement in solution)
+    return (
+        pieces == list(range(len(state.available_pieces)))
+        and occupied == state.bits.playable & ~state.bits.occupied
+    )
+
+
+def test_classic_has_20_solutions():
+    state = GameState()
+    solver = Solver.from_board(state)
+    assert solver.count() == 20
+    assert len(list(solver.solutions())) == 20
+
+
+def test_count_stops_at_limit():
+    solver = Solver.from_board(GameState())
+    assert solver.count(limit=3) == 3
+    assert solver.count(limit=100) == 20
+
+
+def test_count_rejects_zero_limit():
+    with pytest.raises(ValueError):
+        Solver.from_board(GameState()).count(limit=0)
+
+
+def test_first_solution_covers_the_board():
+    state = GameState()
+    solution = Solver.from_board(state).solve()
+    assert solution is not None
+    assert covers_board(state, solution)
+    assert solution == next(Solver.from_board(state).solutions())
+
+
+def test_every_solution_is_distinct_and_valid():
+    state = GameState()
+    solutions = list(Solver.from_board(state).solutions())
+    assert all(covers_board(state, solution) for solution in solutions)
+    assert len({frozenset(solution) for solution in solutions}) == len(solutions)
+
+
+def test_solution_plays_to_a_win():
+    state = GameState()
+    solution = Solver.from_board(state).solve()
+    pieces = list(state.available_pieces)
+    for placement in solution:
+        piece = pieces[placement.piece]
+        piece.orientation = placement.orientation
+        assert state.can_place(piece, placement.row, placement.col)
+        state.play(piece, placement.row, placement.col)
+    assert state.has_won
+
+
+def test_partial_board_is_solved_from_where_it_stands():
+    state = GameState()
+    first = Solver.from_board(state).solve()[0]
+    piece = state.available_pieces[first.piece]
+    piece.orientation = first.orientation
+    state.play(piece, first.row, first.col)
+
+    solver = Solver.from_board(state)
+    solutions = list(solver.solutions())
+    assert solutions
+    assert all(covers_board(state, solution) for solution in solutions)
+
+
+def test_stop_ends_the_search():
+    solver = Solver.from_board(GameState())
+    assert solver.solve(stop=lambda: True) is None
+    # The matrix is untouched, so the next search still finds everything
+    assert solver.count() == 20
+
+
+def test_dead_board_has_no_solution():
+    state = GameState()
+    state.available_pieces = state.available_pieces[:-1]
+    assert Solver.from_board(state).solve() is None
+    assert Solver.from_board(state).count() == 0
@@ -0,0 +1,87 @@
+"""Selection-strip offsets, hit tests and visible ranges"""
+
+from src.models.piece import Piece, kind_for
+from src.models.strip import StripLayout
+
+CELL = 10
+PADDING = 100
+
+
+def pieces(*widths):
+    """Get one-row pieces of the given widths in cells"""
+    return [Piece(kind=kind_for([[1] * width], (255, 0, 0))) for width in widths]
+
+
+def layout(*widths):
+    strip = StripLayout(CELL, PADDING)
+    strip.rebuild(pieces(*widths))
+    return strip
+
+
+def test_offsets_leave_a_cell_between_pieces():
+    strip = layout(2, 3, 1)
+    assert strip.starts == [100, 130, 170]
+    assert strip.widths == [20, 30, 10]
+    assert strip.width() == 80
+
+
+def test_piece_at_edges():
+    strip = layout(2, 3)
+    assert strip.piece_at(100, 0) == 0
+    assert strip.piece_at(119, 9) == 0
+    # Right and bottom edges are outside, as is the gap between pieces
+    assert strip.piece_at(120, 0) is None
+    assert strip.piece_at(100, 10) is None
+    assert strip.piece_at(125, 0) is None
+    assert strip.piece_at(130, 0) == 1
+    assert strip.piece_at(159, 0) == 1
+    assert strip.piece_at(160, 0) is None
+    assert strip.piece_at(99, 0) is None
+    assert strip.piece_at(100, -1) is None
+
+
+def test_piece_at_on_an_empty_strip():
+    strip = layout()
+    assert strip.piece_at(PADDING, 0) is None
+    assert strip.width() == -CELL
+    assert list(strip.visible(0, 1000)) == []
+
+
+def test_visible_at_window_edges():
+    strip = layout(2, 3, 1)  # pieces span [100, 120), [130, 160), [170, 180)
+    assert list(strip.visible(0, 1000)) == [0, 1, 2]
+    # A piece ending exactly at the left edge is scrolled out
+    assert list(strip.visible(120, 1000)) == [1, 2]
+    assert list(strip.visible(119, 1000)) == [0, 1, 2]
+    # A piece starting exactly at the right edge is not shown yet
+    assert list(strip.visible(0, 130)) == [0]
+    assert list(strip.visible(0, 131)) == [0, 1]
+    # Scrolled past everything
+    assert list(strip.visible(180, 100)) == []
+
+
+def test_remove_and_resize_match_a_rebuild():
+    items = pieces(2, 3, 1, 4)
+    strip = StripLayout(CELL, PADDING)
+    strip.rebuild(items)
+
+    strip.remove(1)
+    del items[1]
+    items[0].rotate()
+    strip.resize(0, items[0])
+
+    fresh = StripLayout(CELL, PADDING)
+    fresh.rebuild(items)
+    assert (strip.starts, strip.widths, strip.heights) == (
+        fresh.starts,
+        fresh.widths,
+        fresh.heights,
+    )
+
+
+def test_every_change_bumps_the_version():
+    strip = layout(2, 3)
+    version = strip.version
+    strip.resize(0, pieces(2)[0])
+    strip.remove(0)
+    assert strip.version == version + 2